@@ -0,0 +1,170 @@
+import random
+import sys
+import time
+from array import array
+from collections import Counter
+
+import degrees
+
+# Sources traced together by khop_counts, one bit each
+BATCH = 256
+
+
+def people_to_movies(graph, vector, combine):
+    """
+    Sparse product of the transposed people x movies star matrix with
+    a vector over people: each movie combines the values of its cast.
+    """
+    result = []
+    for movie in range(graph.num_movies):
+        values = [vector[person] for person in graph.stars_for(movie)]
+        result.append(combine(values) if values else None)
+    return result
+
+
+def movies_to_people(graph, vector, combine):
+    """
+    Sparse product of the people x movies star matrix with a vector
+    over movies: each person combines the values of their movies.
+    """
+    result = []
+    for person in range(graph.num_people):
+        values = [vector[movie] for movie in graph.movies_for(person)
+                  if vector[movie] is not None]
+        result.append(combine(values) if values else None)
+    return result
+
+
+def bitwise_or(values):
+    combined = 0
+    for value in values:
+        combined |= value
+    return combined
+
+
+def khop_counts(graph, sources, k):
+    """
+    Returns, for each person index in sources, a list whose i-th entry
+    is how many other people are within i + 1 degrees of separation,
+    for i up to k - 1.
+
+    Sources are traced BATCH at a time: every person holds a bit mask of
+    the sources that have reached them, and each hop is two boolean
+    sparse matrix-vector products (people -> movies -> people) over
+    those masks, so one pass over the graph serves the whole batch.
+    """
+    counts = {}
+    for start in range(0, len(sources), BATCH):
+        batch = sources[start:start + BATCH]
+        reached = [0] * graph.num_people
+        for bit, source in enumerate(batch):
+            reached[source] |= 1 << bit
+        frontier = list(reached)
+        totals = [[0] * k for _ in batch]
+
+        for hop in range(k):
+            movies = people_to_movies(graph, frontier, bitwise_or)
+            spread = movies_to_people(graph, movies, bitwise_or)
+
+            # Keep only the sources reaching each person for the first time
+            frontier = []
+            for person, mask in enumerate(spread):
+                new = (mask or 0) & ~reached[person]
+                reached[person] |= new
+                frontier.append(new)
+                while new:
+                    low = new & -new
+                    totals[low.bit_length() - 1][hop] += 1
+                    new ^= low
+
+        for bit, source in enumerate(batch):
+            running = 0
+            cumulative = []
+            for count in totals[bit]:
+                running += count
+                cumulative.append(running)
+            counts[source] = cumulative
+    return counts
+
+
+def components(graph):
+    """
+    Labels connected components by min-label propagation: every
+    person starts with their own index as label, and each round takes
+    the minimum over movies and back, through the same sparse products,
+    until no label changes. Returns an array of labels by person index.
+    """
+    labels = array("i", range(graph.num_people))
+    changed = True
+    while changed:
+        movies = people_to_movies(graph, labels, min)
+        spread = movies_to_people(graph, movies, min)
+        changed = False
+        for person, label in enumerate(spread):
+            if label is not None and label < labels[person]:
+                labels[person] = label
+                changed = True
+    return labels
+
+
+def component_sizes(labels):
+    """Returns a Counter mapping component size to how many components have it."""
+    return Counter(Counter(labels).values())
+
+
+def degree_histogram(graph, by="movies"):
+    """
+    Returns a Counter mapping degree to the number of people with it
+    (or, for "cast", movies with it). by is "movies" (movies per person),
+    "cast" (people per movie) or "costars" (co-star slots per person).
+    """
+    if by == "movies":
+        values = [len(graph.movies_for(person))
+                  for person in range(graph.num_people)]
+    elif by == "cast":
+        values = [len(graph.stars_for(movie))
+                  for movie in range(graph.num_movies)]
+    elif by == "costars":
+        values = [graph.degree(person) for person in range(graph.num_people)]
+    else:
+        raise ValueError(f"unknown degree kind: {by}")
+    return Counter(values)
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit("Usage: python analytics.py [directory] [hops] [sample]")
+    directory = sys.argv[1] if len(sys.argv) > 1 else "large"
+    hops = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    sample = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    graph = degrees.graph
+    print(f"Data loaded: {graph.num_people} people, {graph.num_movies} movies.")
+
+    for by in ["movies", "cast", "costars"]:
+        histogram = degree_histogram(graph, by)
+        top = ", ".join(f"{degree}: {count}"
+                        for degree, count in sorted(histogram.items())[:10])
+        print(f"Degree histogram ({by}): {top}")
+
+    start = time.perf_counter()
+    labels = components(graph)
+    sizes = Counter(labels)
+    print(f"{len(sizes)} components, largest has {max(sizes.values())} people "
+          f"({time.perf_counter() - start:.2f} seconds)")
+
+    rng = random.Random(0)
+    sources = rng.sample(range(graph.num_people), min(sample, graph.num_people))
+    start = time.perf_counter()
+    counts = khop_counts(graph, sources, hops)
+    mean = [sum(counts[source][hop] for source in sources) / len(sources)
+            for hop in range(hops)]
+    print(f"Mean people within 1..{hops} hops of {len(sources)} random people: "
+          + ", ".join(f"{value:.1f}" for value in mean)
+          + f" ({time.perf_counter() - start:.2f} seconds)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import degrees
+
+# Graph used by this process, set by load
+graph = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer degrees of separation queries in bulk, "
+                    "printing one JSON object per line."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("queries", nargs="?", default="-",
+                        help="file of 'source,target' lines (default: stdin)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--policy", choices=sorted(degrees.POLICIES),
+                        default="most-credited",
+                        help="how to pick between people sharing a name")
+    parser.add_argument("--fuzzy", type=int, default=0, metavar="EDITS",
+                        help="accept names within this many edits")
+    args = parser.parse_args()
+
+    load(args.directory)
+    if args.queries == "-":
+        groups, errors = read_queries(sys.stdin, args.policy, args.fuzzy)
+    else:
+        with open(args.queries, encoding="utf-8") as f:
+            groups, errors = read_queries(f, args.policy, args.fuzzy)
+
+    for record in errors:
+        emit(record)
+    for records in run(groups, args.directory, args.jobs):
+        for record in records:
+            emit(record)
+
+
+def load(directory):
+    """
+    Loads the data for this process. Workers call this too, and
+    pick up the snapshot written by the parent.
+    """
+    global graph
+    degrees.load_data(directory)
+    graph = degrees.graph
+
+
+def read_queries(lines, policy="most-credited", max_distance=0):
+    """
+    Parses 'source,target' lines, where each side is a person id
+    or a name (a tab also works as the separator). Names shared by
+    several people are settled by policy, see degrees.POLICIES.
+    Returns a dict mapping each source person id to a list of
+    (source, target, target id) queries, keeping the text as given,
+    plus error records for unresolved queries.
+    """
+    groups = {}
+    errors = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        separator = "\t" if "\t" in line else ","
+        source, _, target = (part.strip() for part in line.partition(separator))
+
+        source_id = resolve(source, policy, max_distance)
+        target_id = resolve(target, policy, max_distance)
+        if source_id is None or target_id is None:
+            missing = source if source_id is None else target
+            errors.append({"source": source, "target": target,
+                           "source_id": source_id, "target_id": target_id,
+                           "error": f"person not found: {missing}"})
+            continue
+        groups.setdefault(source_id, []).append((source, target, target_id))
+    return groups, errors
+
+
+def resolve(person, policy="most-credited", max_distance=0):
+    """
+    Returns the person id for an id or a name, else None.
+    """
+    if person in graph.person_index:
+        return person
+    return degrees.person_id_for_name(person, policy, max_distance)
+
+
+def run(groups, directory, jobs):
+    """
+    Yields the answer records for every source, running one search
+    per source and spreading sources over a process pool.
+    """
+    if jobs <= 1 or len(groups) <= 1:
+        for source_id, queries in groups.items():
+            yield answer(source_id, queries)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=load,
+                             initargs=(directory,)) as executor:
+        futures = [executor.submit(answer, source_id, queries)
+                   for source_id, queries in groups.items()]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def answer(source_id, queries):
+    """
+    Answers every (source, target, target id) query of one source
+    id with a single breadth-first search. Returns a list of records
+    carrying each query as given next to the ids it resolved to.
+    """
+    source_index = graph.person_index[source_id]
+    target_indices = [graph.person_index[target_id]
+                      for _, _, target_id in queries]
+    paths = graph.single_source(source_index, target_indices)
+
+    records = []
+    for (source, target, target_id), target_index in zip(queries,
+                                                         target_indices):
+        path = graph.translate(paths[target_index])
+        records.append({
+            "source": source,
+            "target": target,
+            "source_id": source_id,
+            "target_id": target_id,
+            "degrees": None if path is None else len(path),
+            "path": path,
+        })
+    return records
+
+
+def emit(record):
+    """Writes one JSON line and flushes it straight away."""
+    sys.stdout.write(json.dumps(record) + "\n")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import random
+import sys
+import time
+from functools import partial
+
+import degrees
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit("Usage: python benchmark.py [directory] [pairs] [seed]")
+    directory = sys.argv[1] if len(sys.argv) > 1 else "large"
+    pairs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+    print("Loading data...")
+    degrees.load_data(directory, use_snapshot=False)
+    print("Data loaded.")
+    graph = degrees.graph
+    degrees.load_landmarks()
+
+    # Pick random person pairs, the same ones for every mode
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    queries = [(rng.choice(person_ids), rng.choice(person_ids))
+               for _ in range(pairs)]
+
+    # Maps a column label to the search function and its mode,
+    # bypassing the path cache so every search really runs
+    uncached = partial(degrees.shortest_path, cache=False)
+    searches = {
+        "bfs": (uncached, "bfs"),
+        "bidirectional": (uncached, "bidirectional"),
+        "compact-bfs": (graph.shortest_path, "bfs"),
+        "compact-bidir": (graph.shortest_path, "bidirectional"),
+        "astar": (uncached, "astar"),
+    }
+    modes = list(searches)
+    totals = {mode: [0, 0.0] for mode in modes}
+
+    print(f"{'source':>10} {'target':>10} {'degrees':>7}", end="")
+    for mode in modes:
+        print(f" {mode:>14}", end="")
+    print()
+
+    for source, target in queries:
+        lengths = set()
+        print(f"{source:>10} {target:>10}", end="")
+        counts = []
+        for mode in modes:
+            stats = {}
+            start = time.perf_counter()
+            search, search_mode = searches[mode]
+            path = search(source, target, mode=search_mode, stats=stats)
+            totals[mode][0] += stats["expanded"]
+            totals[mode][1] += time.perf_counter() - start
+            lengths.add(None if path is None else len(path))
+            counts.append(stats["expanded"])
+
+        # Every mode must agree on the degrees of separation
+        if len(lengths) != 1:
+            sys.exit(f"Modes disagree for {source} -> {target}: {lengths}")
+        length = lengths.pop()
+        print(f" {'-' if length is None else length:>7}", end="")
+        for count in counts:
+            print(f" {count:>14}", end="")
+        print()
+
+    print()
+    for mode in modes:
+        expanded, seconds = totals[mode]
+        print(f"{mode}: {expanded} people expanded, "
+              f"{seconds * 1000:.1f} ms total")
+
+
+if __name__ == "__main__":
+    main()
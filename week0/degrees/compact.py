@@ -0,0 +1,586 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+
+# Snapshot files start with this tag and end with a trailer
+# holding the offset and length of their JSON header
+SNAPSHOT_MAGIC = b"DEGSNAP1"
+SNAPSHOT_TRAILER = struct.Struct("<QQ")
+
+# Integer arrays stored in a snapshot, in file order
+SNAPSHOT_ARRAYS = ["person_offsets", "person_movies", "movie_offsets",
+                   "movie_people", "name_order"]
+
+# String tables stored in a snapshot
+SNAPSHOT_STRINGS = ["person_ids", "person_names", "person_births",
+                    "movie_ids", "movie_titles", "movie_years"]
+
+
+class CompactGraph():
+    """
+    Integer-indexed copy of the degrees graph.
+
+    People and movies are numbered 0..n-1 in load order, and the
+    star relation is kept twice in CSR form: the movies of person p
+    are person_movies[person_offsets[p]:person_offsets[p + 1]], and
+    the people in movie m are movie_people[movie_offsets[m]:movie_offsets[m + 1]].
+    name_order lists person indices sorted by lowercase name.
+
+    The integer arrays are either array.array objects or, for a graph
+    loaded from a snapshot, memoryviews over the memory-mapped file.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 name_order):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        self.name_order = name_order
+
+        # Maps original string ids back to their integer index
+        self.person_index = {
+            person_id: i for i, person_id in enumerate(person_ids)
+        }
+        self.movie_index = {
+            movie_id: i for i, movie_id in enumerate(movie_ids)
+        }
+
+        # Rows added since the CSR arrays were built: movie indices per
+        # person index, person indices per movie index, and person ids
+        # per lowercase name for people missing from name_order
+        self.extra_movies = {}
+        self.extra_stars = {}
+        self.extra_names = {}
+
+    @classmethod
+    def from_dicts(cls, people, movies):
+        """
+        Builds a compact graph from the people and movies dicts
+        filled in by degrees.load_data.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        person_offsets, person_movies = _csr(
+            [people[person_id]["movies"] for person_id in person_ids],
+            movie_index
+        )
+        movie_offsets, movie_people = _csr(
+            [movies[movie_id]["stars"] for movie_id in movie_ids],
+            person_index
+        )
+        person_names = [people[person_id]["name"] for person_id in person_ids]
+        name_order = array("i", sorted(
+            range(len(person_ids)), key=lambda i: person_names[i].lower()
+        ))
+        return cls(
+            person_ids,
+            person_names,
+            [people[person_id]["birth"] for person_id in person_ids],
+            movie_ids,
+            [movies[movie_id]["title"] for movie_id in movie_ids],
+            [movies[movie_id]["year"] for movie_id in movie_ids],
+            person_offsets, person_movies, movie_offsets, movie_people,
+            name_order
+        )
+
+    def save(self, path, stamp):
+        """
+        Writes the graph to a snapshot file at path.
+        stamp is any JSON value describing the source data; load
+        only accepts the snapshot back when given an equal stamp.
+        """
+        if self.extra_movies or self.extra_stars or self.extra_names:
+            return self.rebuilt().save(path, stamp)
+
+        header = {
+            "stamp": stamp,
+            "byteorder": sys.byteorder,
+            "itemsize": array("i").itemsize,
+            "arrays": {},
+        }
+        temp = f"{path}.tmp"
+        with open(temp, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            for name in SNAPSHOT_ARRAYS:
+                values = getattr(self, name)
+                if not isinstance(values, array):
+                    values = array("i", values)
+                header["arrays"][name] = [f.tell(), len(values)]
+                values.tofile(f)
+
+            strings = json.dumps(
+                {name: getattr(self, name) for name in SNAPSHOT_STRINGS}
+            ).encode("utf-8")
+            header["strings"] = [f.tell(), len(strings)]
+            f.write(strings)
+
+            encoded = json.dumps(header).encode("utf-8")
+            offset = f.tell()
+            f.write(encoded)
+            f.write(SNAPSHOT_TRAILER.pack(offset, len(encoded)))
+
+        # Swap the file in whole, so readers never see a partial snapshot
+        os.replace(temp, path)
+
+    @classmethod
+    def load(cls, path, stamp):
+        """
+        Memory-maps a snapshot file written by save.
+        Returns None if the file is missing, unreadable,
+        or was written for a different stamp or platform.
+        """
+        try:
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+                raise ValueError("not a snapshot")
+            offset, length = SNAPSHOT_TRAILER.unpack(
+                data[-SNAPSHOT_TRAILER.size:]
+            )
+            header = json.loads(data[offset:offset + length])
+        except (ValueError, struct.error):
+            data.close()
+            return None
+        if (header["stamp"] != stamp
+                or header["byteorder"] != sys.byteorder
+                or header["itemsize"] != array("i").itemsize):
+            data.close()
+            return None
+
+        # Integer arrays are used in place, straight from the mapping
+        view = memoryview(data)
+        arrays = {}
+        for name, (offset, length) in header["arrays"].items():
+            end = offset + length * header["itemsize"]
+            arrays[name] = view[offset:end].cast("i")
+
+        offset, length = header["strings"]
+        strings = json.loads(view[offset:offset + length].tobytes())
+
+        return cls(**strings, **arrays)
+
+    def rebuilt(self):
+        """
+        Returns a copy of the graph with every added row
+        folded into fresh CSR arrays.
+        """
+        person_offsets, person_movies = _pack(
+            self.movies_for(person) for person in range(self.num_people)
+        )
+        movie_offsets, movie_people = _pack(
+            self.stars_for(movie) for movie in range(self.num_movies)
+        )
+        name_order = array("i", sorted(
+            range(self.num_people), key=lambda i: self.person_names[i].lower()
+        ))
+        return CompactGraph(
+            list(self.person_ids), list(self.person_names),
+            list(self.person_births), list(self.movie_ids),
+            list(self.movie_titles), list(self.movie_years),
+            person_offsets, person_movies, movie_offsets, movie_people,
+            name_order
+        )
+
+    def add_person(self, person_id, name, birth):
+        """Appends a person with no movies yet. Returns their index."""
+        person = len(self.person_ids)
+        self.person_ids.append(person_id)
+        self.person_names.append(name)
+        self.person_births.append(birth)
+        self.person_index[person_id] = person
+        self.extra_names.setdefault(name.lower(), set()).add(person_id)
+        return person
+
+    def add_movie(self, movie_id, title, year):
+        """Appends a movie with no stars yet. Returns its index."""
+        movie = len(self.movie_ids)
+        self.movie_ids.append(movie_id)
+        self.movie_titles.append(title)
+        self.movie_years.append(year)
+        self.movie_index[movie_id] = movie
+        return movie
+
+    def add_star(self, person_id, movie_id):
+        """Records that a person starred in a movie."""
+        person = self.person_index[person_id]
+        movie = self.movie_index[movie_id]
+        self.extra_movies.setdefault(person, []).append(movie)
+        self.extra_stars.setdefault(movie, []).append(person)
+
+    @property
+    def num_people(self):
+        return len(self.person_ids)
+
+    @property
+    def num_movies(self):
+        return len(self.movie_ids)
+
+    def ids_for_name(self, name):
+        """
+        Returns the person ids whose lowercase name is name.lower(),
+        by binary search over name_order.
+        """
+        name = name.lower()
+        low, high = 0, len(self.name_order)
+        while low < high:
+            middle = (low + high) // 2
+            if self.person_names[self.name_order[middle]].lower() < name:
+                low = middle + 1
+            else:
+                high = middle
+        person_ids = set(self.extra_names.get(name, ()))
+        while (low < len(self.name_order)
+               and self.person_names[self.name_order[low]].lower() == name):
+            person_ids.add(self.person_ids[self.name_order[low]])
+            low += 1
+        return person_ids
+
+    def movies_for(self, person):
+        """Returns the movie indices a person index starred in."""
+        offsets = self.person_offsets
+        if person + 1 < len(offsets):
+            movies = self.person_movies[offsets[person]:offsets[person + 1]]
+        else:
+            movies = []
+        if self.extra_movies and person in self.extra_movies:
+            movies = list(movies) + self.extra_movies[person]
+        return movies
+
+    def stars_for(self, movie):
+        """Returns the person indices who starred in a movie index."""
+        offsets = self.movie_offsets
+        if movie + 1 < len(offsets):
+            stars = self.movie_people[offsets[movie]:offsets[movie + 1]]
+        else:
+            stars = []
+        if self.extra_stars and movie in self.extra_stars:
+            stars = list(stars) + self.extra_stars[movie]
+        return stars
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people
+        who starred with a given person index.
+        """
+        for movie in self.movies_for(person):
+            for other in self.stars_for(movie):
+                yield movie, other
+
+    def degree(self, person):
+        """
+        Returns how many co-star slots a person index has, counting
+        a co-star once per shared movie.
+        """
+        return sum(
+            len(self.stars_for(movie)) - 1 for movie in self.movies_for(person)
+        )
+
+    def distances(self, source):
+        """
+        Returns an array holding every person's number of
+        degrees of separation from source, or -1 if unreachable.
+        """
+        distance = array("h", [-1]) * self.num_people
+        seen_movie = bytearray(self.num_movies)
+        distance[source] = 0
+
+        frontier = [source]
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for person in frontier:
+                for movie in self.movies_for(person):
+                    if seen_movie[movie]:
+                        continue
+                    seen_movie[movie] = 1
+                    for other in self.stars_for(movie):
+                        if distance[other] == -1:
+                            distance[other] = depth
+                            next_frontier.append(other)
+            frontier = next_frontier
+        return distance
+
+    def shortest_path(self, source, target, mode="bfs", stats=None):
+        """
+        Same contract as degrees.shortest_path: takes string person ids
+        and returns a list of (movie_id, person_id) pairs, or None.
+        The search itself only touches integer indices.
+        """
+        source = self.person_index[source]
+        target = self.person_index[target]
+        if mode == "bfs":
+            steps = self.bfs(source, target, stats)
+        elif mode == "bidirectional":
+            steps = self.bidirectional(source, target, stats)
+        else:
+            raise ValueError(f"unknown search mode: {mode}")
+        return self.translate(steps)
+
+    def translate(self, steps):
+        """
+        Turns a list of (movie, person) index pairs back into
+        (movie_id, person_id) string pairs.
+        """
+        if steps is None:
+            return None
+        return [(self.movie_ids[movie], self.person_ids[person])
+                for movie, person in steps]
+
+    def bfs(self, source, target, stats=None):
+        """
+        Breadth-first search from source to target over person indices.
+        Returns a list of (movie, person) index pairs, or None.
+        """
+        return self.single_source(source, [target], stats)[target]
+
+    def single_source(self, source, targets, stats=None):
+        """
+        Runs one breadth-first search from source that stops once every
+        person index in targets has been reached. Returns a dict mapping
+        each target to its list of (movie, person) index pairs, or None.
+        """
+        parent_person = array("i", [-1]) * self.num_people
+        parent_movie = array("i", [-1]) * self.num_people
+        seen_movie = bytearray(self.num_movies)
+        parent_person[source] = source
+
+        remaining = set(targets)
+        remaining.discard(source)
+        frontier = [source]
+        expanded = 0
+        while frontier and remaining:
+            next_frontier = []
+            for person in frontier:
+                expanded += 1
+                for movie in self.movies_for(person):
+
+                    # A movie's cast only needs to be scanned once
+                    if seen_movie[movie]:
+                        continue
+                    seen_movie[movie] = 1
+                    for other in self.stars_for(movie):
+                        if parent_person[other] != -1:
+                            continue
+                        parent_person[other] = person
+                        parent_movie[other] = movie
+                        next_frontier.append(other)
+                        remaining.discard(other)
+                    if not remaining:
+                        break
+                if not remaining:
+                    break
+            frontier = next_frontier
+
+        if stats is not None:
+            stats["expanded"] = expanded
+
+        paths = {}
+        for target in targets:
+            if parent_person[target] == -1:
+                paths[target] = None
+                continue
+            steps = []
+            person = target
+            while person != source:
+                steps.append((parent_movie[person], person))
+                person = parent_person[person]
+            steps.reverse()
+            paths[target] = steps
+        return paths
+
+    def bidirectional(self, source, target, stats=None):
+        """
+        Bidirectional breadth-first search over person indices,
+        expanding the smaller frontier one layer at a time.
+        Returns a list of (movie, person) index pairs, or None.
+        """
+        # Each side maps a person to (movie, person, depth) towards its start
+        forward = {source: None}
+        backward = {target: None}
+        forward_frontier = [source]
+        backward_frontier = [target]
+        depth = {True: 0, False: 0}
+        expanded = 0
+
+        meeting = source if source == target else None
+        while meeting is None and forward_frontier and backward_frontier:
+            is_forward = len(forward_frontier) <= len(backward_frontier)
+            if is_forward:
+                frontier, visited, other = forward_frontier, forward, backward
+            else:
+                frontier, visited, other = backward_frontier, backward, forward
+            depth[is_forward] += 1
+
+            best = None
+            next_frontier = []
+            for person in frontier:
+                expanded += 1
+                for movie in self.movies_for(person):
+                    for neighbor in self.stars_for(movie):
+                        if neighbor in visited:
+                            continue
+                        visited[neighbor] = (movie, person, depth[is_forward])
+                        next_frontier.append(neighbor)
+                        if neighbor in other:
+                            joined = 0 if other[neighbor] is None \
+                                else other[neighbor][2]
+                            if best is None or joined < best:
+                                best, meeting = joined, neighbor
+
+            if is_forward:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+
+        if stats is not None:
+            stats["expanded"] = expanded
+        if meeting is None:
+            return None
+
+        steps = []
+        person = meeting
+        while forward[person] is not None:
+            movie, parent, _ = forward[person]
+            steps.append((movie, person))
+            person = parent
+        steps.reverse()
+
+        person = meeting
+        while backward[person] is not None:
+            movie, person, _ = backward[person]
+            steps.append((movie, person))
+        return steps
+
+
+class PeopleView(Mapping):
+    """
+    Read-only stand-in for the degrees people dict,
+    building each person's record from a compact graph on access.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        person = graph.person_index[person_id]
+        return {
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "movies": {graph.movie_ids[movie]
+                       for movie in graph.movies_for(person)}
+        }
+
+    def __contains__(self, person_id):
+        return person_id in self.graph.person_index
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return self.graph.num_people
+
+
+class MoviesView(Mapping):
+    """
+    Read-only stand-in for the degrees movies dict,
+    building each movie's record from a compact graph on access.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        movie = graph.movie_index[movie_id]
+        return {
+            "title": graph.movie_titles[movie],
+            "year": graph.movie_years[movie],
+            "stars": {graph.person_ids[person]
+                      for person in graph.stars_for(movie)}
+        }
+
+    def __contains__(self, movie_id):
+        return movie_id in self.graph.movie_index
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return self.graph.num_movies
+
+
+class NamesView(Mapping):
+    """
+    Read-only stand-in for the degrees names dict,
+    mapping lowercase names to sets of person ids.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        person_ids = self.graph.ids_for_name(name)
+        if not person_ids:
+            raise KeyError(name)
+        return person_ids
+
+    def __iter__(self):
+        previous = None
+        for person in self.graph.name_order:
+            name = self.graph.person_names[person].lower()
+            if name != previous:
+                yield name
+                previous = name
+
+        # Names only held by people added since name_order was built
+        for name, person_ids in self.graph.extra_names.items():
+            if self.graph.ids_for_name(name) == person_ids:
+                yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def _pack(rows):
+    """Packs rows of integers into (offsets, values) arrays."""
+    offsets = array("i", [0])
+    values = array("i")
+    for row in rows:
+        values.extend(row)
+        offsets.append(len(values))
+    return offsets, values
+
+
+def _csr(rows, index):
+    """
+    Packs a list of id collections into (offsets, values) arrays,
+    translating every id through index and dropping unknown ones.
+    """
+    offsets = array("i", [0])
+    values = array("i")
+    for row in rows:
+        values.extend(sorted(index[key] for key in row if key in index))
+        offsets.append(len(values))
+    return offsets, values
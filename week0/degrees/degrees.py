@@ -1,7 +1,13 @@
 import csv
+import json
+import os
 import sys
+import time
 
-from util import Node, StackFrontier, QueueFrontier
+from compact import CompactGraph, MoviesView, NamesView, PeopleView
+from landmarks import LandmarkIndex
+from lookup import NameIndex
+from util import LRUCache, Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +18,65 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact integer-indexed copy of the data, see compact.py
+graph = None
 
-def load_data(directory):
+# Landmark distance index over graph, see landmarks.py
+landmarks = None
+
+# Directory the data was last loaded from
+data_directory = None
+
+# Trie over names, built by get_name_index, see lookup.py
+name_index = None
+
+# Neighbor sets of well-connected people, keyed by person_id
+neighbor_cache = LRUCache(4096)
+
+# Finished searches, keyed by (source, target) with source <= target
+path_cache = LRUCache(65536)
+
+# People in at least this many movies get their neighbor sets cached
+HUB_MOVIES = 8
+
+# File names of the snapshot, landmark index and update log
+# kept next to the CSV files
+SNAPSHOT = "degrees.snapshot"
+LANDMARKS = "degrees.landmarks"
+DELTAS = "degrees.deltas"
+
+
+def load_data(directory, use_snapshot=True):
     """
     Load data from CSV files into memory.
+
+    If use_snapshot is set and the directory holds a snapshot written
+    for the current CSV files, it is memory-mapped instead, and names,
+    people and movies become views over it. Otherwise the CSV files
+    are parsed, the update log is replayed on top of them and a fresh
+    snapshot is written.
+
+    Returns "snapshot" or "csv", depending on where the data came from.
     """
+    global graph, landmarks, name_index, data_directory, names, people, movies
+
+    data_directory = directory
+    landmarks = None
+    name_index = None
+    neighbor_cache.clear()
+    path_cache.clear()
+    snapshot = os.path.join(directory, SNAPSHOT)
+    stamp = data_stamp(directory)
+    if use_snapshot:
+        graph = CompactGraph.load(snapshot, stamp)
+        if graph is not None:
+            names = NamesView(graph)
+            people = PeopleView(graph)
+            movies = MoviesView(graph)
+            return "snapshot"
+
+    graph = None
+    names, people, movies = {}, {}, {}
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -51,6 +111,191 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    # Apply updates made since the CSV files were written
+    replay_deltas(directory)
+
+    graph = CompactGraph.from_dicts(people, movies)
+    if use_snapshot:
+        save_snapshot(stamp)
+    return "csv"
+
+
+def save_snapshot(stamp=None):
+    """
+    Writes the loaded data, including any updates, to the snapshot
+    file. stamp defaults to the current state of the data files.
+    """
+    if stamp is None:
+        stamp = data_stamp(data_directory)
+    try:
+        graph.save(os.path.join(data_directory, SNAPSHOT), stamp)
+    except OSError:
+        # A read-only data directory just means no snapshot
+        pass
+
+
+def add_person(person_id, name, birth=""):
+    """
+    Adds a person to the loaded data and the update log.
+    """
+    if person_id in people:
+        raise ValueError(f"person already exists: {person_id}")
+    record_delta({"kind": "person", "id": person_id,
+                  "name": name, "birth": birth})
+
+
+def add_movie(movie_id, title, year=""):
+    """
+    Adds a movie to the loaded data and the update log.
+    """
+    if movie_id in movies:
+        raise ValueError(f"movie already exists: {movie_id}")
+    record_delta({"kind": "movie", "id": movie_id,
+                  "title": title, "year": year})
+
+
+def add_star(person_id, movie_id):
+    """
+    Records that a person starred in a movie,
+    in the loaded data and the update log.
+    """
+    if person_id not in people:
+        raise KeyError(person_id)
+    if movie_id not in movies:
+        raise KeyError(movie_id)
+    if movie_id in people[person_id]["movies"]:
+        return
+    record_delta({"kind": "star", "person_id": person_id,
+                  "movie_id": movie_id})
+
+
+def record_delta(record):
+    """
+    Applies one update and appends it to the update log,
+    so it is replayed the next time the CSV files are loaded.
+    """
+    apply_delta(record)
+    path = os.path.join(data_directory, DELTAS)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def replay_deltas(directory):
+    """
+    Applies every update in a directory's update log, in order.
+    """
+    path = os.path.join(directory, DELTAS)
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                apply_delta(json.loads(line))
+
+
+def apply_delta(record):
+    """
+    Applies one update record to every in-memory structure:
+    the dicts (unless they are views over graph), graph,
+    the name index and the caches.
+    """
+    global landmarks
+
+    kind = record["kind"]
+    views = isinstance(people, PeopleView)
+    if kind == "person":
+        person_id, name = record["id"], record["name"]
+        if not views:
+            people[person_id] = {
+                "name": name,
+                "birth": record["birth"],
+                "movies": set()
+            }
+            names.setdefault(name.lower(), set()).add(person_id)
+        if graph is not None:
+            graph.add_person(person_id, name, record["birth"])
+        if name_index is not None:
+            name_index.add(name.lower(), {person_id})
+
+    elif kind == "movie":
+        movie_id = record["id"]
+        if not views:
+            movies[movie_id] = {
+                "title": record["title"],
+                "year": record["year"],
+                "stars": set()
+            }
+        if graph is not None:
+            graph.add_movie(movie_id, record["title"], record["year"])
+
+    elif kind == "star":
+        person_id, movie_id = record["person_id"], record["movie_id"]
+
+        # Cached neighbor sets of the movie's cast are now incomplete
+        for star_id in movies[movie_id]["stars"]:
+            neighbor_cache.discard(star_id)
+        neighbor_cache.discard(person_id)
+
+        if not views:
+            people[person_id]["movies"].add(movie_id)
+            movies[movie_id]["stars"].add(person_id)
+        if graph is not None:
+            graph.add_star(person_id, movie_id)
+
+        # A new edge can shorten any path
+        path_cache.clear()
+
+    else:
+        raise ValueError(f"unknown update kind: {kind}")
+
+    # Landmark distances only cover the graph they were built for
+    landmarks = None
+
+
+def load_landmarks(count=16):
+    """
+    Loads the landmark index for the current data, building it
+    from the count best-connected people and saving it next to
+    the CSV files if there is no up-to-date one on disk.
+    """
+    global landmarks
+    path = os.path.join(data_directory, LANDMARKS)
+    stamp = data_stamp(data_directory)
+    landmarks = LandmarkIndex.load(path, graph, stamp)
+    if landmarks is None or len(landmarks.landmarks) != count:
+        landmarks = LandmarkIndex.build(graph, count)
+        try:
+            landmarks.save(path, graph, stamp)
+        except OSError:
+            pass
+    return landmarks
+
+
+def separation_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation
+    between two person ids, from the landmark index alone.
+    """
+    if landmarks is None:
+        load_landmarks()
+    return landmarks.bounds(graph.person_index[source],
+                            graph.person_index[target])
+
+
+def data_stamp(directory):
+    """
+    Returns the modification time and size of each CSV file and of
+    the update log, used to tell whether a snapshot still matches.
+    """
+    stamp = {}
+    for filename in ["people.csv", "movies.csv", "stars.csv", DELTAS]:
+        path = os.path.join(directory, filename)
+        if filename == DELTAS and not os.path.exists(path):
+            continue
+        info = os.stat(path)
+        stamp[filename] = [info.st_mtime_ns, info.st_size]
+    return stamp
+
 
 def main():
     if len(sys.argv) > 2:
@@ -59,8 +304,10 @@ def main():
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    start = time.perf_counter()
+    origin = load_data(directory)
+    elapsed = time.perf_counter() - start
+    print(f"Data loaded from {origin} in {elapsed:.2f} seconds.")
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -84,13 +331,78 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, mode="bfs", stats=None, cache=True):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    mode is "bfs" for a one-sided search from the source,
+    "bidirectional" to grow frontiers from both ends, or "astar"
+    for a goal-directed search guided by the landmark index.
+    If stats is a dict, stats["expanded"] is set to the number
+    of people whose neighbors were expanded.
+
+    Unless cache is False, answers are kept in path_cache and reused
+    for the same pair of people in either direction and any mode.
+
     If no possible path, returns None.
     """
+    if not cache:
+        return search(source, target, mode, stats)
+
+    # Paths are stored one way round per pair, and reversed when needed
+    key = (source, target) if source <= target else (target, source)
+    cached = path_cache.get(key, False)
+    if cached is not False:
+        if stats is not None:
+            stats["expanded"] = 0
+        if cached is None:
+            return None
+        if key[0] == source:
+            return list(cached)
+        return reverse_path(target, cached)
+
+    path = search(source, target, mode, stats)
+    if path is None:
+        path_cache.put(key, None)
+    elif key[0] == source:
+        path_cache.put(key, tuple(path))
+    else:
+        path_cache.put(key, tuple(reverse_path(source, path)))
+    return path
+
+
+def reverse_path(source, path):
+    """
+    Turns a path of (movie_id, person_id) pairs leading away from
+    source into the path leading back to source.
+    """
+    people_on_path = [source] + [person_id for _, person_id in path]
+    return [(path[i][0], people_on_path[i])
+            for i in range(len(path) - 1, -1, -1)]
+
+
+def cache_stats():
+    """Returns hit and miss counts for the neighbor and path caches."""
+    return {
+        "neighbors": neighbor_cache.stats(),
+        "paths": path_cache.stats(),
+    }
+
+
+def search(source, target, mode="bfs", stats=None):
+    """
+    Runs one uncached search for shortest_path.
+    """
+    if mode == "bidirectional":
+        return bidirectional_path(source, target, stats)
+    elif mode == "astar":
+        if landmarks is None:
+            load_landmarks()
+        return landmarks.shortest_path(graph, source, target, stats)
+    elif mode != "bfs":
+        raise ValueError(f"unknown search mode: {mode}")
+
     """
     A person ID that has appeared goes into the explored frontier, 
     This ensures that we do not backtrack and that we will find the shortest path
@@ -111,6 +423,8 @@ def shortest_path(source, target):
 
         # If there is nothing in frontier, then no path
         if frontier.empty():
+            if stats is not None:
+                stats["expanded"] = len(explored)
             return None
         
         # Choose a node from the frontier
@@ -133,7 +447,9 @@ def shortest_path(source, target):
             for i in range(len(actions)):
                 t = (actions[i], cells[i])
                 shortest_path.append(t)
-            
+
+            if stats is not None:
+                stats["expanded"] = len(explored)
             return shortest_path
                 
         # Node is not goal, mark ID as explored
@@ -149,15 +465,209 @@ def shortest_path(source, target):
                 frontier.add(child)
 
 
+def bidirectional_path(source, target, stats=None):
+    """
+    Returns the same result as shortest_path, but searches from the
+    source and the target at once, always expanding whichever frontier
+    is smaller, until the two searches meet.
+    """
+    # Each side maps a person id to the (movie_id, person_id) step that
+    # reached it, pointing back towards the side's own starting person
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+    expanded = 0
+
+    meeting = source if source == target else None
+    while meeting is None and forward_frontier and backward_frontier:
+
+        # Expand one whole layer of the smaller side
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, visited, other = forward_frontier, forward, backward
+        else:
+            frontier, visited, other = backward_frontier, backward, forward
+
+        next_frontier = []
+        for person_id in frontier:
+            expanded += 1
+            for movie_id, neighbor in neighbors_for_person(person_id):
+                if neighbor in visited:
+                    continue
+                visited[neighbor] = (movie_id, person_id)
+                next_frontier.append(neighbor)
+
+                # Keep finishing the layer so the shortest join is chosen
+                if neighbor in other and (
+                    meeting is None
+                    or _depth(other, neighbor) < _depth(other, meeting)
+                ):
+                    meeting = neighbor
+
+        if visited is forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    if stats is not None:
+        stats["expanded"] = expanded
+    if meeting is None:
+        return None
 
-def person_id_for_name(name):
+    # Walk back from the meeting person to the source
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
+
+    # Walk on from the meeting person to the target
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, person_id = backward[person_id]
+        path.append((movie_id, person_id))
+
+    return path
+
+
+def _depth(visited, person_id):
+    """
+    Returns how many steps person_id is from the start of a search side.
+    """
+    depth = 0
+    while visited[person_id] is not None:
+        person_id = visited[person_id][1]
+        depth += 1
+    return depth
+
+
+def all_shortest_paths(source, target):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs
+    that connects the source to the target, one at a time.
+
+    The breadth-first layers are built once, keeping every
+    (movie_id, person_id) parent of each person from the layer
+    before it, and paths are read off them only as they are asked for.
+    """
+    parents = {source: []}
+    frontier = [source]
+    while frontier and target not in parents:
+        layer = {}
+        for person_id in frontier:
+            for movie_id, neighbor in neighbors_for_person(person_id):
+                if neighbor not in parents:
+                    layer.setdefault(neighbor, []).append((movie_id, person_id))
+        parents.update(layer)
+        frontier = list(layer)
+
+    if target in parents:
+        yield from _walk_back(source, target, parents)
+
+
+def _walk_back(source, person_id, parents):
+    """
+    Yields the paths from source to person_id in a parent multi-set.
+    """
+    if person_id == source:
+        yield []
+        return
+    for movie_id, parent in sorted(parents[person_id]):
+        for path in _walk_back(source, parent, parents):
+            yield path + [(movie_id, person_id)]
+
+
+def near_shortest_paths(source, target, max_length=None):
+    """
+    Yields lists of (movie_id, person_id) pairs connecting the source
+    to the target that never visit a person twice, shortest first,
+    up to max_length steps long (or until they run out).
+
+    Distances to the target are grown one layer at a time, only as far
+    as the current length needs, and prune every branch that could not
+    reach the target in the steps left.
+    """
+    if source == target:
+        yield []
+        return
+
+    distance = {target: 0}
+    frontier = [target]
+    reached = 0
+    length = 0
+    while max_length is None or length < max_length:
+        length += 1
+
+        # Extend the distances to cover people up to length steps away
+        while reached < length and frontier:
+            next_frontier = []
+            for person_id in frontier:
+                for _, neighbor in neighbors_for_person(person_id):
+                    if neighbor not in distance:
+                        distance[neighbor] = reached + 1
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+            reached += 1
+
+        if source not in distance:
+            if not frontier:
+                return
+            continue
+
+        # A path that never repeats a person cannot be longer than this
+        if length >= len(distance):
+            return
+        yield from _paths_of_length(source, target, length, distance, {source})
+
+
+def _paths_of_length(person_id, target, remaining, distance, on_path):
+    """
+    Yields the paths from person_id to target of exactly remaining steps
+    that avoid everyone in on_path.
+    """
+    if remaining == 0:
+        if person_id == target:
+            yield []
+        return
+    for movie_id, neighbor in sorted(neighbors_for_person(person_id)):
+        if neighbor in on_path or distance.get(neighbor, remaining) >= remaining:
+            continue
+
+        # The target can only be the last step
+        if neighbor == target and remaining != 1:
+            continue
+        on_path.add(neighbor)
+        for rest in _paths_of_length(neighbor, target, remaining - 1,
+                                     distance, on_path):
+            yield [(movie_id, neighbor)] + rest
+        on_path.remove(neighbor)
+
+
+def person_id_for_name(name, policy="ask", max_distance=0):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    With policy "ask" the user picks between people who share a name.
+    Any other policy is a key of POLICIES and picks without prompting.
+    If max_distance is above zero and nobody has exactly this name,
+    the closest names within that many edits are considered instead.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = names.get(name.lower(), set())
+    if not person_ids and max_distance > 0:
+        matches = get_name_index().fuzzy(name, max_distance)
+        if matches:
+            closest = matches[0][0]
+            person_ids = set.union(*[ids for distance, _, ids in matches
+                                     if distance == closest])
+    person_ids = sorted(person_ids)
+
     if len(person_ids) == 0:
         return None
+    elif len(person_ids) > 1 and policy != "ask":
+        return min(person_ids, key=POLICIES[policy])
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
@@ -176,16 +686,72 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def most_credited(person_id):
+    """Sort key putting the person in the most movies first."""
+    return (-len(people[person_id]["movies"]), person_id)
+
+
+def earliest_birth(person_id):
+    """Sort key putting the earliest born person first, unknown births last."""
+    birth = people[person_id]["birth"]
+    if birth:
+        return (0, int(birth), person_id)
+    return (1, 0, person_id)
+
+
+# Non-interactive ways to choose between people who share a name
+POLICIES = {
+    "most-credited": most_credited,
+    "earliest-birth": earliest_birth,
+}
+
+
+def get_name_index():
+    """
+    Returns the trie index over names for prefix and fuzzy lookups,
+    building it the first time it is needed after each load.
+    """
+    global name_index
+    if name_index is None:
+        name_index = NameIndex(names)
+    return name_index
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
+    # After a warm start, read the compact graph directly: going through
+    # the views would build a record per person and movie visited
+    compact = isinstance(people, PeopleView)
+    if compact:
+        person = graph.person_index[person_id]
+        movie_ids = graph.movies_for(person)
+    else:
+        movie_ids = people[person_id]["movies"]
+
+    # Only people in many movies are worth remembering
+    hub = len(movie_ids) >= HUB_MOVIES
+    if hub:
+        cached = neighbor_cache.get(person_id)
+        if cached is not None:
+            return cached
+
     neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
+    if compact:
+        for movie in movie_ids:
+            movie_id = graph.movie_ids[movie]
+            for star in graph.stars_for(movie):
+                neighbors.add((movie_id, graph.person_ids[star]))
+    else:
+        for movie_id in movie_ids:
+            for star_id in movies[movie_id]["stars"]:
+                neighbors.add((movie_id, star_id))
+
+    if hub:
+        neighbors = frozenset(neighbors)
+        neighbor_cache.put(person_id, neighbors)
     return neighbors
 
 
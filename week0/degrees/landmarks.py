@@ -0,0 +1,225 @@
+import heapq
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from compact import SNAPSHOT_TRAILER
+
+# Landmark files start with this tag and share the snapshot trailer
+LANDMARK_MAGIC = b"DEGLMK01"
+
+
+class LandmarkIndex():
+    """
+    Breadth-first distances from a few well-connected people
+    ("landmarks") to everyone else in a compact graph.
+
+    By the triangle inequality, for any landmark L the distance between
+    s and t lies between |d(L, s) - d(L, t)| and d(L, s) + d(L, t),
+    which gives distance bounds in O(#landmarks) and an admissible
+    heuristic for A* search.
+    """
+
+    def __init__(self, landmarks, distances):
+        # Person indices of the landmarks, and one distance array each
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, count=16):
+        """
+        Picks the count people with the most co-stars as landmarks
+        and runs one breadth-first search from each of them.
+        """
+        ranked = sorted(range(graph.num_people), key=graph.degree,
+                        reverse=True)
+        landmarks = ranked[:count]
+        distances = [graph.distances(landmark) for landmark in landmarks]
+        return cls(landmarks, distances)
+
+    def save(self, path, graph, stamp):
+        """
+        Writes the index to path. Landmarks are stored by person id,
+        and stamp must match for load to accept the file back.
+        """
+        header = {
+            "stamp": stamp,
+            "byteorder": sys.byteorder,
+            "itemsize": array("h").itemsize,
+            "landmarks": [graph.person_ids[landmark]
+                          for landmark in self.landmarks],
+            "rows": [],
+        }
+        temp = f"{path}.tmp"
+        with open(temp, "wb") as f:
+            f.write(LANDMARK_MAGIC)
+            for distance in self.distances:
+                if not isinstance(distance, array):
+                    distance = array("h", distance)
+                header["rows"].append([f.tell(), len(distance)])
+                distance.tofile(f)
+
+            encoded = json.dumps(header).encode("utf-8")
+            offset = f.tell()
+            f.write(encoded)
+            f.write(SNAPSHOT_TRAILER.pack(offset, len(encoded)))
+        os.replace(temp, path)
+
+    @classmethod
+    def load(cls, path, graph, stamp):
+        """
+        Memory-maps an index written by save.
+        Returns None if the file is missing, unreadable or stale.
+        """
+        try:
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            if data[:len(LANDMARK_MAGIC)] != LANDMARK_MAGIC:
+                raise ValueError("not a landmark index")
+            offset, length = SNAPSHOT_TRAILER.unpack(
+                data[-SNAPSHOT_TRAILER.size:]
+            )
+            header = json.loads(data[offset:offset + length])
+        except (ValueError, struct.error):
+            data.close()
+            return None
+        if (header["stamp"] != stamp
+                or header["byteorder"] != sys.byteorder
+                or header["itemsize"] != array("h").itemsize
+                or any(person_id not in graph.person_index
+                       for person_id in header["landmarks"])):
+            data.close()
+            return None
+
+        view = memoryview(data)
+        distances = [
+            view[offset:offset + length * header["itemsize"]].cast("h")
+            for offset, length in header["rows"]
+        ]
+        landmarks = [graph.person_index[person_id]
+                     for person_id in header["landmarks"]]
+        return cls(landmarks, distances)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation
+        between two person indices. upper is math.inf when no landmark
+        reaches both, and both are math.inf when some landmark proves
+        the two people are not connected.
+        """
+        if source == target:
+            return 0, 0
+        lower, upper = 1, math.inf
+        for distance in self.distances:
+            a, b = distance[source], distance[target]
+            if a == -1 and b == -1:
+                continue
+            if a == -1 or b == -1:
+                return math.inf, math.inf
+            lower = max(lower, abs(a - b))
+            upper = min(upper, a + b)
+        return lower, upper
+
+    def within(self, source, target, k):
+        """
+        Returns True if the two person indices are known to be within
+        k degrees, False if they are known not to be, or None if the
+        landmarks cannot tell.
+        """
+        lower, upper = self.bounds(source, target)
+        if upper <= k:
+            return True
+        if lower > k:
+            return False
+        return None
+
+    def shortest_path(self, graph, source, target, stats=None):
+        """
+        Same contract as degrees.shortest_path, over a compact graph,
+        using A* search guided by the landmark lower bounds.
+        """
+        steps = self.astar(graph, graph.person_index[source],
+                           graph.person_index[target], stats)
+        return graph.translate(steps)
+
+    def astar(self, graph, source, target, stats=None):
+        """
+        A* search from source to target over person indices.
+        Returns a list of (movie, person) index pairs, or None.
+        """
+        # Distances from each landmark that reaches the target
+        columns = [(distance, distance[target])
+                   for distance in self.distances if distance[target] != -1]
+        cut_off = [distance for distance in self.distances
+                   if distance[target] == -1]
+
+        def estimate(person):
+            """Lower bound on the distance from person to target."""
+            best = 0
+            for distance, to_target in columns:
+                d = distance[person]
+                if d == -1:
+                    return None
+                best = max(best, abs(d - to_target))
+            return best
+
+        # A landmark reaching only one of the two proves there is no path
+        if estimate(source) is None or any(
+            distance[source] != -1 for distance in cut_off
+        ):
+            if stats is not None:
+                stats["expanded"] = 0
+            return None
+
+        parents = {source: None}
+        cost = {source: 0}
+        closed = set()
+        counter = 0
+
+        # Ties on f are broken towards deeper nodes, then insertion order
+        heap = [(estimate(source), 0, counter, source)]
+        found = False
+        while heap:
+            _, negative_cost, _, person = heapq.heappop(heap)
+            if person in closed:
+                continue
+            if person == target:
+                found = True
+                break
+            closed.add(person)
+
+            next_cost = -negative_cost + 1
+            for movie, other in graph.neighbors(person):
+                if other in closed or cost.get(other, math.inf) <= next_cost:
+                    continue
+                remaining = estimate(other)
+                if remaining is None:
+                    continue
+                cost[other] = next_cost
+                parents[other] = (movie, person)
+                counter += 1
+                heapq.heappush(
+                    heap, (next_cost + remaining, -next_cost, counter, other)
+                )
+
+        if stats is not None:
+            stats["expanded"] = len(closed)
+        if not found:
+            return None
+
+        steps = []
+        person = target
+        while parents[person] is not None:
+            movie, parent = parents[person]
+            steps.append((movie, person))
+            person = parent
+        steps.reverse()
+        return steps
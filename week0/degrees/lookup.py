@@ -0,0 +1,104 @@
+class TrieNode():
+    __slots__ = ("children", "person_ids")
+
+    def __init__(self):
+        self.children = {}
+        self.person_ids = None
+
+
+class NameIndex():
+    """
+    Character trie over lowercase names, supporting exact,
+    prefix and edit-distance bounded (fuzzy) lookups.
+    """
+
+    def __init__(self, names):
+        """
+        Builds the index from a mapping of lowercase names
+        to sets of person ids, like degrees.names.
+        """
+        self.root = TrieNode()
+        for name, person_ids in names.items():
+            self.add(name, person_ids)
+
+    def add(self, name, person_ids):
+        """Adds person ids under a name."""
+        node = self.root
+        for char in name.lower():
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = TrieNode()
+            node = child
+        if node.person_ids is None:
+            node.person_ids = set()
+        node.person_ids.update(person_ids)
+
+    def exact(self, name):
+        """Returns the set of person ids with exactly this name."""
+        node = self.find(name.lower())
+        if node is None or node.person_ids is None:
+            return set()
+        return set(node.person_ids)
+
+    def find(self, prefix):
+        """Returns the trie node reached by prefix, or None."""
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def prefix(self, prefix, limit=None):
+        """
+        Returns (name, person_ids) pairs for names starting with prefix,
+        in alphabetical order, stopping after limit names if given.
+        """
+        prefix = prefix.lower()
+        node = self.find(prefix)
+        if node is None:
+            return []
+
+        matches = []
+        stack = [(prefix, node)]
+        while stack and (limit is None or len(matches) < limit):
+            name, node = stack.pop()
+            if node.person_ids:
+                matches.append((name, set(node.person_ids)))
+
+            # Push in reverse so the smallest character comes off first
+            for char in sorted(node.children, reverse=True):
+                stack.append((name + char, node.children[char]))
+        return matches
+
+    def fuzzy(self, name, max_distance=2):
+        """
+        Returns (distance, name, person_ids) triples for every name
+        within max_distance edits (insertions, deletions or
+        substitutions) of name, closest first.
+        """
+        name = name.lower()
+        matches = []
+
+        # Each entry carries the edit-distance row for its prefix
+        stack = [("", self.root, list(range(len(name) + 1)))]
+        while stack:
+            prefix, node, row = stack.pop()
+            if node.person_ids and row[-1] <= max_distance:
+                matches.append((row[-1], prefix, set(node.person_ids)))
+
+            for char, child in node.children.items():
+                next_row = [row[0] + 1]
+                for i in range(1, len(name) + 1):
+                    next_row.append(min(
+                        next_row[i - 1] + 1,
+                        row[i] + 1,
+                        row[i - 1] + (name[i - 1] != char)
+                    ))
+
+                # No longer name can get closer than the best of this row
+                if min(next_row) <= max_distance:
+                    stack.append((prefix + char, child, next_row))
+
+        matches.sort(key=lambda match: (match[0], match[1]))
+        return matches
@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import signal
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET requests against the loaded degrees data:
+
+        /path?source=...&target=...[&mode=...][&policy=...]
+        /neighbors?person=...[&policy=...]
+        /bounds?source=...&target=...
+        /stats
+
+    People may be given by id or by name. Every answer is a JSON
+    object carrying the time spent on it in "latency_ms".
+    """
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        query = {key: values[-1]
+                 for key, values in parse_qs(url.query).items()}
+
+        routes = {
+            "/path": path,
+            "/neighbors": neighbors,
+            "/bounds": bounds,
+            "/stats": stats,
+        }
+        route = routes.get(url.path)
+        if route is None:
+            status, body = 404, {"error": f"unknown endpoint: {url.path}"}
+        else:
+            try:
+                status, body = 200, route(query)
+            except LookupError as e:
+                status, body = 404, {"error": str(e.args[0])}
+            except ValueError as e:
+                status, body = 400, {"error": str(e)}
+
+        latency = (time.perf_counter() - start) * 1000
+        body["latency_ms"] = round(latency, 3)
+        self.server.record(url.path if route else "unknown", latency)
+
+        encoded = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def address_string(self):
+        # Unix socket peers have no address
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return "local"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class LatencyMixIn():
+    """
+    Keeps per-endpoint request counts and latency totals.
+    """
+
+    verbose = False
+
+    def init_latency(self):
+        self.latency_lock = threading.Lock()
+        self.latencies = {}
+
+    def record(self, endpoint, latency):
+        with self.latency_lock:
+            count, total, worst = self.latencies.get(endpoint, (0, 0.0, 0.0))
+            self.latencies[endpoint] = (count + 1, total + latency,
+                                        max(worst, latency))
+
+    def latency_stats(self):
+        with self.latency_lock:
+            return {
+                endpoint: {
+                    "count": count,
+                    "mean_ms": round(total / count, 3),
+                    "max_ms": round(worst, 3),
+                }
+                for endpoint, (count, total, worst) in self.latencies.items()
+            }
+
+
+class QueryServer(LatencyMixIn, ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address):
+        super().__init__(address, QueryHandler)
+        self.init_latency()
+
+
+class UnixQueryServer(LatencyMixIn, socketserver.ThreadingMixIn,
+                      socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, path):
+        super().__init__(path, QueryHandler)
+        self.init_latency()
+
+
+# The running server, read by the stats endpoint
+server = None
+
+
+def person(query, key):
+    """
+    Resolves the person named by query[key], given as id or name.
+    Raises LookupError if there is no such person.
+    """
+    if key not in query:
+        raise ValueError(f"missing parameter: {key}")
+    value = query[key]
+
+    # Never "ask": that would prompt on the server's own terminal
+    policy = query.get("policy", "most-credited")
+    if policy not in degrees.POLICIES:
+        raise ValueError(f"unknown policy: {policy}")
+
+    if value in degrees.people:
+        return value
+    person_id = degrees.person_id_for_name(
+        value, policy, int(query.get("fuzzy", 0))
+    )
+    if person_id is None:
+        raise LookupError(f"person not found: {value}")
+    return person_id
+
+
+def path(query):
+    source = person(query, "source")
+    target = person(query, "target")
+    mode = query.get("mode", "bidirectional")
+    if mode not in ["bfs", "bidirectional", "astar"]:
+        raise ValueError(f"unknown search mode: {mode}")
+
+    stats = {}
+    steps = degrees.shortest_path(source, target, mode=mode, stats=stats)
+    return {
+        "source": source,
+        "target": target,
+        "degrees": None if steps is None else len(steps),
+        "path": steps,
+        "expanded": stats["expanded"],
+    }
+
+
+def neighbors(query):
+    person_id = person(query, "person")
+    return {
+        "person": person_id,
+        "neighbors": sorted(degrees.neighbors_for_person(person_id)),
+    }
+
+
+def bounds(query):
+    lower, upper = degrees.separation_bounds(person(query, "source"),
+                                             person(query, "target"))
+
+    # JSON has no infinity, so unknown bounds become null
+    return {
+        "lower": None if lower == float("inf") else lower,
+        "upper": None if upper == float("inf") else upper,
+    }
+
+
+def stats(query):
+    return {
+        "caches": degrees.cache_stats(),
+        "latency": server.latency_stats(),
+    }
+
+
+def main():
+    global server
+
+    parser = argparse.ArgumentParser(
+        description="Serve degrees of separation queries over HTTP."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--socket", metavar="PATH",
+                        help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--verbose", action="store_true",
+                        help="log every request")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    start = time.perf_counter()
+    origin = degrees.load_data(args.directory)
+
+    # Built here, before any handler thread could build them at once
+    degrees.get_name_index()
+    degrees.load_landmarks()
+    elapsed = time.perf_counter() - start
+    print(f"Data loaded from {origin} in {elapsed:.2f} seconds.")
+
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        server = UnixQueryServer(args.socket)
+        print(f"Serving on {args.socket}")
+    else:
+        server = QueryServer((args.host, args.port))
+        print(f"Serving on http://{args.host}:{server.server_address[1]}")
+    server.verbose = args.verbose
+
+    # shutdown waits for serve_forever, so it must run on another thread
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown).start()
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+        print("Server stopped.")
+
+
+if __name__ == "__main__":
+    main()
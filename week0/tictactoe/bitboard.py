@@ -0,0 +1,204 @@
+"""
+Tic Tac Toe engine on bitboards.
+
+A position is a pair (x, o) of 9-bit integers, one per player, where
+bit 3 * i + j is set if that player holds cell (i, j). Moves are bit-ORs
+and wins are mask comparisons. The functions at the bottom take and
+return boards in the list-of-lists format of tictactoe.py, so runner.py
+can import this module in its place.
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111
+
+# The 8 lines: rows, columns, then the two diagonals
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+]
+
+# Cell bits in the order moves are tried
+CELLS = [1 << cell for cell in range(9)]
+
+# Minimax values (+1 X wins, -1 O wins, 0 tie) keyed by (x, o)
+values = {}
+
+
+def count(bits):
+    """Returns how many cells are set in bits."""
+    return bin(bits).count("1")
+
+
+def to_move(x, o):
+    """Returns X or O, whoever moves next."""
+    return X if count(x) == count(o) else O
+
+
+def is_win(bits):
+    """Returns True if bits hold a complete line."""
+    for mask in WIN_MASKS:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+def empty_cells(x, o):
+    """Returns the bits of the empty cells, in CELLS order."""
+    taken = x | o
+    return [cell for cell in CELLS if not taken & cell]
+
+
+def play(x, o, cell):
+    """Returns the position after the player to move takes cell."""
+    if count(x) == count(o):
+        return x | cell, o
+    return x, o | cell
+
+
+def value(x, o):
+    """
+    Returns the minimax value of a position: 1 if X wins with
+    perfect play, -1 if O does, 0 for a tie. Results are memoized.
+    """
+    key = (x, o)
+    if key in values:
+        return values[key]
+
+    if is_win(x):
+        v = 1
+    elif is_win(o):
+        v = -1
+    elif x | o == FULL:
+        v = 0
+    elif count(x) == count(o):
+        v = max(value(x | cell, o) for cell in empty_cells(x, o))
+    else:
+        v = min(value(x, o | cell) for cell in empty_cells(x, o))
+    values[key] = v
+    return v
+
+
+def best_cell(x, o):
+    """
+    Returns the bit of an optimal move for the player to move,
+    or None if the game is over.
+    """
+    if is_win(x) or is_win(o) or x | o == FULL:
+        return None
+    sign = 1 if count(x) == count(o) else -1
+    best, choice = None, None
+    for cell in empty_cells(x, o):
+        v = sign * value(*play(x, o, cell))
+        if best is None or v > best:
+            best, choice = v, cell
+    return choice
+
+
+def from_board(board):
+    """Converts a list-of-lists board to an (x, o) position."""
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(x, o):
+    """Converts an (x, o) position to a list-of-lists board."""
+    board = []
+    for i in range(3):
+        row = []
+        for j in range(3):
+            cell = 1 << (3 * i + j)
+            row.append(X if x & cell else O if o & cell else EMPTY)
+        board.append(row)
+    return board
+
+
+def to_action(cell):
+    """Converts a cell bit to an (i, j) action."""
+    return divmod(cell.bit_length() - 1, 3)
+
+
+def to_cell(action):
+    """Converts an (i, j) action to a cell bit."""
+    return 1 << (3 * action[0] + action[1])
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return to_board(0, 0)
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return to_move(*from_board(board))
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {to_action(cell) for cell in empty_cells(*from_board(board))}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    x, o = from_board(board)
+    cell = to_cell(action)
+    if (x | o) & cell:
+        raise ValueError(f"cell {action} is taken")
+    return to_board(*play(x, o, cell))
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = from_board(board)
+    if is_win(x):
+        return X
+    if is_win(o):
+        return O
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = from_board(board)
+    return is_win(x) or is_win(o) or x | o == FULL
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = from_board(board)
+    if is_win(x):
+        return 1
+    if is_win(o):
+        return -1
+    return 0
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    cell = best_cell(*from_board(board))
+    return None if cell is None else to_action(cell)
@@ -0,0 +1,96 @@
+"""
+Solves every reachable Tic Tac Toe position and writes the opening book
+that tictactoe.minimax consults before searching.
+
+Usage: python book.py [path]
+"""
+
+import sys
+import time
+
+import tictactoe as ttt
+
+
+def solve():
+    """
+    Returns a dict mapping the canonical_index of every reachable class
+    of symmetric positions to its book entry, searching each class once
+    through one representative board.
+    """
+    # Search for real, not through an older book
+    ttt.book = None
+    ttt.book_loaded = True
+
+    entries = {}
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        index, permutation = ttt.canonical_index(board)
+        if index in entries:
+            continue
+
+        if ttt.player(board) == ttt.X:
+            value = ttt.max_value(board)
+        else:
+            value = ttt.min_value(board)
+
+        # Store the move as seen on the canonical board
+        move = ttt.minimax(board)
+        if move is None:
+            cell = ttt.BOOK_NO_MOVE
+        else:
+            cell = permutation.index(3 * move[0] + move[1])
+        entries[index] = (value + 1) << 4 | cell
+
+        if not ttt.terminal(board):
+            for action in ttt.actions(board):
+                stack.append(ttt.result(board, action))
+    return entries
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python book.py [path]")
+    path = sys.argv[1] if len(sys.argv) == 2 else ttt.BOOK_PATH
+
+    start = time.perf_counter()
+    entries = solve()
+    records = bytearray()
+    for index, entry in sorted(entries.items()):
+        records += bytes([index & 0xFF, index >> 8, entry])
+    with open(path, "wb") as f:
+        f.write(ttt.BOOK_MAGIC)
+        f.write(records)
+    print(f"Solved {len(entries)} classes of symmetric positions in "
+          f"{time.perf_counter() - start:.2f} seconds, wrote "
+          f"{len(ttt.BOOK_MAGIC) + len(records)} bytes to {path}")
+
+    # Time a cold load, then a lookup of every solved position
+    start = time.perf_counter()
+    if not ttt.load_book(path):
+        sys.exit("Could not read the book back")
+    print(f"Load: {(time.perf_counter() - start) * 1e3:.3f} ms")
+
+    boards = []
+    stack = [ttt.initial_state()]
+    seen = set()
+    while stack:
+        board = stack.pop()
+        key = ttt.board_key(board)
+        if key in seen or ttt.terminal(board):
+            continue
+        seen.add(key)
+        boards.append(board)
+        for action in ttt.actions(board):
+            stack.append(ttt.result(board, action))
+
+    start = time.perf_counter()
+    for board in boards:
+        ttt.book_move(board)
+    elapsed = time.perf_counter() - start
+    print(f"Lookup: {elapsed / len(boards) * 1e6:.2f} us per position "
+          f"over {len(boards)} positions")
+
+
+if __name__ == "__main__":
+    main()
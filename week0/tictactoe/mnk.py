@@ -0,0 +1,321 @@
+"""
+Generalized m,n,k-game player: an m x n board where k in a row wins.
+
+MNKGame offers the same functions as tictactoe.py, as methods, so
+runner.py can drive either. Exhaustive minimax is hopeless beyond 3x3,
+so minimax here runs iterative-deepening alpha-beta with a heuristic
+evaluation, stopping when the per-move time budget runs out.
+"""
+
+import math
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won position, well above any heuristic value
+WIN_SCORE = 10 ** 9
+
+# Nodes searched between time budget checks
+CHECK_EVERY = 16
+
+
+class Timeout(Exception):
+    pass
+
+
+class MNKGame():
+
+    # Same names as in tictactoe.py, for code that takes either
+    X = X
+    O = O
+    EMPTY = EMPTY
+
+    def __init__(self, rows=3, cols=3, k=3, time_limit=1.0):
+        if k > max(rows, cols):
+            raise ValueError("k must fit on the board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.time_limit = time_limit
+
+        # Statistics of the last minimax call: depth completed, nodes searched
+        self.stats = {"depth": 0, "nodes": 0}
+
+        # Set by stop to end a search running on another thread early
+        self.stopping = False
+
+        # Every run of k cells in a line, as lists of flat cell indices
+        self.windows = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < cols:
+                        self.windows.append([
+                            (i + di * step) * cols + (j + dj * step)
+                            for step in range(k)
+                        ])
+
+        # Windows through each cell, for checking wins after a move
+        self.cell_windows = [[] for _ in range(rows * cols)]
+        for window in self.windows:
+            for cell in window:
+                self.cell_windows[cell].append(window)
+
+        # Moves further than this from every stone are not searched
+        self.radius = min(2, k - 1)
+
+        # Score of a window holding n stones of one player and none of the other
+        self.weights = [0] + [10 ** n for n in range(1, k + 1)]
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.cols for _ in range(self.rows)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        x_count = sum(row.count(X) for row in board)
+        o_count = sum(row.count(O) for row in board)
+        return O if x_count > o_count else X
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {(i, j) for i in range(self.rows) for j in range(self.cols)
+                if board[i][j] == EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if board[i][j] != EMPTY:
+            raise ValueError(f"cell {action} is taken")
+        result = [row[:] for row in board]
+        result[i][j] = self.player(board)
+        return result
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        cells = self.flatten(board)
+        for window in self.windows:
+            first = cells[window[0]]
+            if first != EMPTY and all(cells[cell] == first for cell in window):
+                return first
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        if self.winner(board) is not None:
+            return True
+        return all(cell != EMPTY for row in board for cell in row)
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        winner = self.winner(board)
+        if winner == X:
+            return 1
+        elif winner == O:
+            return -1
+        return 0
+
+    def minimax(self, board):
+        """
+        Returns the best action found for the current player on the board
+        within time_limit seconds, by iterative-deepening alpha-beta.
+        """
+        if self.terminal(board):
+            return None
+
+        cells = self.flatten(board)
+        me = self.player(board)
+        self.stats = {"depth": 0, "nodes": 0}
+        self.stopping = False
+        self.deadline = time.perf_counter() + self.time_limit
+
+        candidates = self.candidates(cells)
+        best = candidates[0]
+        empty = sum(1 for cell in cells if cell == EMPTY)
+        for depth in range(1, empty + 1):
+            try:
+                score, move = self.search_root(cells, me, depth, best)
+            except Timeout:
+                break
+            best = move
+            self.stats["depth"] = depth
+
+            # A forced result will not change with a deeper search
+            if abs(score) >= WIN_SCORE - empty:
+                break
+        return divmod(best, self.cols)
+
+    def search(self, board, depth):
+        """
+        Searches the board to a fixed depth with no time limit.
+        Returns (score, action) for the player to move.
+        """
+        cells = self.flatten(board)
+        self.stats = {"depth": 0, "nodes": 0}
+        self.stopping = False
+        self.deadline = math.inf
+        score, move = self.search_root(cells, self.player(board), depth,
+                                       self.candidates(cells)[0])
+        self.stats["depth"] = depth
+        return score, divmod(move, self.cols)
+
+    def stop(self):
+        """
+        Makes a minimax call running on another thread return its best
+        move so far at the next time check.
+        """
+        self.stopping = True
+
+    def search_root(self, cells, me, depth, previous):
+        """
+        Searches every candidate move to depth, trying the previous
+        iteration's best move first. Returns (score, move).
+        """
+        opponent = O if me == X else X
+        moves = self.candidates(cells)
+        moves.remove(previous)
+        moves.insert(0, previous)
+
+        alpha, beta = -math.inf, math.inf
+        best_move = previous
+        for move in moves:
+            cells[move] = me
+            if self.wins(cells, move):
+                score = WIN_SCORE
+            else:
+                score = -self.negamax(cells, opponent, depth - 1,
+                                      -beta, -alpha, 1)
+            cells[move] = EMPTY
+            if score > alpha:
+                alpha, best_move = score, move
+        return alpha, best_move
+
+    def negamax(self, cells, me, depth, alpha, beta, ply):
+        """
+        Returns the score of the position for me, searched to depth
+        plies with alpha-beta pruning. Quicker wins score higher.
+        """
+        self.stats["nodes"] += 1
+        if self.stats["nodes"] % CHECK_EVERY == 0:
+            if self.stopping or time.perf_counter() > self.deadline:
+                raise Timeout()
+
+        # Leaves only need the board scored, not its moves generated
+        if EMPTY not in cells:
+            return 0
+        if depth == 0:
+            return self.evaluate(cells, me)
+
+        moves = self.candidates(cells)
+        opponent = O if me == X else X
+        best = -math.inf
+        for move in moves:
+            cells[move] = me
+            if self.wins(cells, move):
+                score = WIN_SCORE - ply
+            else:
+                score = -self.negamax(cells, opponent, depth - 1,
+                                      -beta, -alpha, ply + 1)
+            cells[move] = EMPTY
+            if score > best:
+                best = score
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+        return best
+
+    def candidates(self, cells):
+        """
+        Returns the empty cells worth searching, most promising first:
+        cells within self.radius of a stone (or the centre on an empty
+        board), ordered by how much they add to either player's open lines.
+        """
+        occupied = [cell for cell, stone in enumerate(cells) if stone != EMPTY]
+        if not occupied:
+            return [(self.rows // 2) * self.cols + self.cols // 2]
+
+        nearby = set()
+        for cell in occupied:
+            i, j = divmod(cell, self.cols)
+            for di in range(-self.radius, self.radius + 1):
+                for dj in range(-self.radius, self.radius + 1):
+                    ni, nj = i + di, j + dj
+                    if 0 <= ni < self.rows and 0 <= nj < self.cols:
+                        neighbor = ni * self.cols + nj
+                        if cells[neighbor] == EMPTY:
+                            nearby.add(neighbor)
+        if not nearby:
+            nearby = {cell for cell, stone in enumerate(cells)
+                      if stone == EMPTY}
+        return sorted(nearby, key=lambda cell: (-self.potential(cells, cell),
+                                                cell))
+
+    def potential(self, cells, cell):
+        """
+        Scores a move by the open lines through it, for both players,
+        so that wins and blocks sort first.
+        """
+        score = 0
+        for window in self.cell_windows[cell]:
+            x_count = o_count = 0
+            for other in window:
+                if cells[other] == X:
+                    x_count += 1
+                elif cells[other] == O:
+                    o_count += 1
+            if o_count == 0:
+                score += self.weights[x_count + 1]
+            if x_count == 0:
+                score += self.weights[o_count + 1]
+        return score
+
+    def wins(self, cells, move):
+        """
+        Returns True if the stone just placed at move completes k in a row.
+        """
+        stone = cells[move]
+        for window in self.cell_windows[move]:
+            if all(cells[cell] == stone for cell in window):
+                return True
+        return False
+
+    def evaluate(self, cells, me):
+        """
+        Heuristic score of the position for me: every window that only
+        one player has stones in counts for them, weighted by how full it is.
+        """
+        score = 0
+        for window in self.windows:
+            x_count = o_count = 0
+            for cell in window:
+                if cells[cell] == X:
+                    x_count += 1
+                elif cells[cell] == O:
+                    o_count += 1
+            if o_count == 0:
+                score += self.weights[x_count]
+            elif x_count == 0:
+                score -= self.weights[o_count]
+        return score if me == X else -score
+
+    def flatten(self, board):
+        """Returns the board's cells as one list, row by row."""
+        return [cell for row in board for cell in row]
@@ -0,0 +1,216 @@
+"""
+Root-split parallel search for mnk.MNKGame.
+
+Each candidate move at the root becomes one task for a pool of processes.
+Workers share the best root score found so far and search their move with
+it as alpha, so moves that cannot beat it are cut off early, while any
+move that could still be best is scored exactly. Ties go to the earliest
+move in the serial order, so the move chosen matches MNKGame.search.
+
+Usage: python parallel.py [rows cols k] [depth]
+"""
+
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mnk import MNKGame, Timeout, WIN_SCORE, X, O
+
+# Below every real score: the shared alpha before any move is scored
+NO_SCORE = -2 * WIN_SCORE
+
+# Per-process state, set by init_worker
+game = None
+best_score = None
+
+
+def init_worker(rows, cols, k, shared):
+    global game, best_score
+    game = MNKGame(rows, cols, k)
+    best_score = shared
+
+
+def search_move(cells, me, depth, move, deadline):
+    """
+    Scores one root move to depth. Returns (score, nodes), with score
+    None if the deadline passed first. A score below the shared best
+    is only an upper bound; one at or above it is exact.
+    """
+    game.stats = {"depth": 0, "nodes": 0}
+    game.stopping = False
+    game.deadline = deadline
+
+    # Searching just below the best so far keeps equal scores exact
+    alpha = best_score.value - 1
+    opponent = O if me == X else X
+    cells[move] = me
+    try:
+        if game.wins(cells, move):
+            score = WIN_SCORE
+        else:
+            score = -game.negamax(cells, opponent, depth - 1,
+                                  -math.inf, -alpha, 1)
+    except Timeout:
+        return None, game.stats["nodes"]
+
+    with best_score.get_lock():
+        if score > best_score.value:
+            best_score.value = score
+    return score, game.stats["nodes"]
+
+
+class ParallelSearch():
+    """
+    Searches positions of game with a pool of processes. Call close
+    when done with it.
+    """
+
+    def __init__(self, game, processes=None):
+        self.game = game
+        self.processes = processes or os.cpu_count()
+        self.best_score = multiprocessing.Value("q", NO_SCORE)
+        self.pool = ProcessPoolExecutor(
+            self.processes, initializer=init_worker,
+            initargs=(game.rows, game.cols, game.k, self.best_score)
+        )
+
+        # Statistics of the last search: depth completed, nodes searched
+        self.stats = {"depth": 0, "nodes": 0}
+
+    def search_root(self, cells, me, depth, previous, deadline):
+        """
+        Searches every candidate move to depth across the pool, in the
+        serial order. Returns (score, move), or None if time ran out.
+        """
+        moves = self.game.candidates(cells)
+        moves.remove(previous)
+        moves.insert(0, previous)
+
+        self.best_score.value = NO_SCORE
+        futures = [self.pool.submit(search_move, cells, me, depth, move,
+                                    deadline)
+                   for move in moves]
+
+        best = None
+        finished = True
+        for move, future in zip(moves, futures):
+            score, nodes = future.result()
+            self.stats["nodes"] += nodes
+            if score is None:
+                finished = False
+            elif best is None or score > best[0]:
+                best = (score, move)
+        return best if finished else None
+
+    def search(self, board, depth):
+        """
+        Searches the board to a fixed depth with no time limit.
+        Returns (score, action) for the player to move.
+        """
+        cells = self.game.flatten(board)
+        self.stats = {"depth": depth, "nodes": 0}
+        score, move = self.search_root(cells, self.game.player(board), depth,
+                                       self.game.candidates(cells)[0],
+                                       math.inf)
+        return score, divmod(move, self.game.cols)
+
+    def minimax(self, board):
+        """
+        Returns the best action found for the current player on the board
+        within the game's time_limit, deepening one ply at a time.
+        """
+        if self.game.terminal(board):
+            return None
+
+        cells = self.game.flatten(board)
+        me = self.game.player(board)
+        self.stats = {"depth": 0, "nodes": 0}
+        deadline = time.perf_counter() + self.game.time_limit
+
+        best = self.game.candidates(cells)[0]
+        empty = sum(1 for cell in cells if cell is None)
+        for depth in range(1, empty + 1):
+            found = self.search_root(cells, me, depth, best, deadline)
+            if found is None:
+                break
+            score, best = found
+            self.stats["depth"] = depth
+
+            # A forced result will not change with a deeper search
+            if abs(score) >= WIN_SCORE - empty:
+                break
+        return divmod(best, self.game.cols)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+def positions(game, count, seed=0):
+    """
+    Returns count boards from short random games played near the centre,
+    none of them over.
+    """
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        board = game.initial_state()
+        for _ in range(rng.randint(2, 6)):
+            cells = game.flatten(board)
+            moves = game.candidates(cells)
+            board = game.result(board, divmod(rng.choice(moves), game.cols))
+        if not game.terminal(board):
+            boards.append(board)
+    return boards
+
+
+def main():
+    if len(sys.argv) not in [1, 2, 4, 5]:
+        sys.exit("Usage: python parallel.py [rows cols k] [depth]")
+    if len(sys.argv) >= 4:
+        rows, cols, k = (int(arg) for arg in sys.argv[1:4])
+    else:
+        rows, cols, k = 7, 7, 5
+    depth = int(sys.argv[-1]) if len(sys.argv) in [2, 5] else 4
+
+    game = MNKGame(rows, cols, k)
+    boards = positions(game, 8)
+    print(f"{len(boards)} positions on {rows}x{cols}, {k} in a row, "
+          f"searched to depth {depth}")
+
+    start = time.perf_counter()
+    serial = []
+    nodes = 0
+    for board in boards:
+        serial.append(game.search(board, depth)[1])
+        nodes += game.stats["nodes"]
+    baseline = time.perf_counter() - start
+    print(f"serial: {baseline:.2f} seconds, {nodes} nodes")
+
+    cores = os.cpu_count()
+    counts = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+    for processes in counts:
+        search = ParallelSearch(game, processes)
+
+        # Start the workers before timing
+        search.search(boards[0], 1)
+
+        start = time.perf_counter()
+        matches = 0
+        nodes = 0
+        for board, expected in zip(boards, serial):
+            if search.search(board, depth)[1] == expected:
+                matches += 1
+            nodes += search.stats["nodes"]
+        elapsed = time.perf_counter() - start
+        search.close()
+        print(f"{processes} of {cores} cores: {elapsed:.2f} seconds, "
+              f"{nodes} nodes, speedup {baseline / elapsed:.2f}x, "
+              f"{matches}/{len(boards)} moves match serial")
+
+
+if __name__ == "__main__":
+    main()
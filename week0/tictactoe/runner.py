@@ -1,8 +1,10 @@
 import pygame
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-import tictactoe as ttt
+import tictactoe
+from mnk import MNKGame
 
 pygame.init()
 size = width, height = 600, 400
@@ -12,19 +14,42 @@ black = (0, 0, 0)
 white = (255, 255, 255)
 
 screen = pygame.display.set_mode(size)
+clock = pygame.time.Clock()
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
+# Boards to choose from as (rows, columns, k in a row); 3x3 plays perfectly
+# with tictactoe.py, larger boards search within a time budget per move
+variants = [(3, 3, 3), (4, 4, 4), (5, 5, 4), (7, 7, 5)]
+variant = 0
+ttt = tictactoe
+
+# The computer searches on a worker thread so the window keeps drawing
+executor = ThreadPoolExecutor(max_workers=1)
+thinking = None
+thinking_since = None
+
+
+def cancel_thinking():
+    """Abandons the computer's search, if one is running."""
+    global thinking
+    if thinking is not None and not thinking.cancel():
+        if isinstance(ttt, MNKGame):
+            ttt.stop()
+    thinking = None
+
+
 user = None
 board = ttt.initial_state()
-ai_turn = False
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            cancel_thinking()
+            executor.shutdown(wait=False)
             sys.exit()
 
     screen.fill(black)
@@ -53,6 +78,15 @@ while True:
         pygame.draw.rect(screen, white, playOButton)
         screen.blit(playO, playORect)
 
+        rows, cols, k = variants[variant]
+        variantButton = pygame.Rect((width / 4), (height / 2) + 80, width / 2, 50)
+        variantText = mediumFont.render(f"Board: {rows}x{cols}, {k} in a row",
+                                        True, black)
+        variantRect = variantText.get_rect()
+        variantRect.center = variantButton.center
+        pygame.draw.rect(screen, white, variantButton)
+        screen.blit(variantText, variantRect)
+
         # Check if button is clicked
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1:
@@ -63,17 +97,30 @@ while True:
             elif playOButton.collidepoint(mouse):
                 time.sleep(0.2)
                 user = ttt.O
+            elif variantButton.collidepoint(mouse):
+                time.sleep(0.2)
+                variant = (variant + 1) % len(variants)
+
+            # Set up the chosen board
+            if user is not None:
+                if variants[variant] == (3, 3, 3):
+                    ttt = tictactoe
+                else:
+                    ttt = MNKGame(rows, cols, k)
+                board = ttt.initial_state()
+                tile_size = 240 // max(rows, cols)
+                moveFont = pygame.font.Font("OpenSans-Regular.ttf",
+                                            tile_size * 3 // 4)
 
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (cols / 2 * tile_size),
+                       height / 2 - (rows / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(rows):
             row = []
-            for j in range(3):
+            for j in range(cols):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -108,22 +155,33 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Show search progress on boards that take a while
+        if thinking is not None and isinstance(ttt, MNKGame):
+            elapsed = time.perf_counter() - thinking_since
+            progress = mediumFont.render(
+                f"{elapsed:.1f}s, {ttt.stats['nodes']} nodes searched",
+                True, white
+            )
+            progressRect = progress.get_rect()
+            progressRect.center = ((width / 2), 65)
+            screen.blit(progress, progressRect)
+
+        # Check for AI move, shown no sooner than half a second after asking
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if thinking is None:
+                thinking = executor.submit(ttt.minimax, board)
+                thinking_since = time.perf_counter()
+            elif (thinking.done()
+                  and time.perf_counter() - thinking_since >= 0.5):
+                board = ttt.result(board, thinking.result())
+                thinking = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(rows):
+                for j in range(cols):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
@@ -139,8 +197,9 @@ while True:
                 mouse = pygame.mouse.get_pos()
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
+                    cancel_thinking()
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
 
     pygame.display.flip()
+    clock.tick(30)
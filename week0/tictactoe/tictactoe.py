@@ -4,11 +4,66 @@ Tic Tac Toe Player
 
 import math
 import copy
+import os
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Minimax values of boards already searched, keyed by canonical_index,
+# so each class of symmetric boards is stored once
+transpositions = {}
+
+# Transposition table lookups that found or missed a stored value
+cache_stats = {"hits": 0, "misses": 0}
+
+# Positions visited by max_value/min_value and by the alpha-beta search
+search_stats = {"nodes": 0}
+
+# Opening book written by book.py: a magic tag, then one 3-byte record
+# per class of symmetric boards, holding its canonical_index (2 bytes,
+# little-endian) and an entry byte with the best move on the canonical
+# board in the low 4 bits and the value + 1 in the next 2
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+BOOK_MAGIC = b"TTTBOOK2"
+BOOK_NO_MOVE = 0x0F
+
+# Book entries by canonical_index once load_book has run, None if there is none
+book = None
+book_loaded = False
+
+
+def symmetry(transform):
+    """
+    Returns the cell permutation p for a transform of (i, j) coordinates:
+    the transformed board holds, at cell k, the original board's cell p[k],
+    with cells numbered 3 * i + j.
+    """
+    permutation = [0] * 9
+    for i in range(3):
+        for j in range(3):
+            ti, tj = transform(i, j)
+            permutation[3 * ti + tj] = 3 * i + j
+    return permutation
+
+
+# The 8 rotations and reflections of the board
+SYMMETRIES = [
+    symmetry(lambda i, j: (i, j)),
+    symmetry(lambda i, j: (j, 2 - i)),
+    symmetry(lambda i, j: (2 - i, 2 - j)),
+    symmetry(lambda i, j: (2 - j, i)),
+    symmetry(lambda i, j: (i, 2 - j)),
+    symmetry(lambda i, j: (2 - i, j)),
+    symmetry(lambda i, j: (j, i)),
+    symmetry(lambda i, j: (2 - j, 2 - i)),
+]
+
+# Move preference when nothing wins or blocks: centre, corners, edges
+PREFERENCE = [[1, 2, 1],
+              [2, 0, 2],
+              [1, 2, 1]]
+
 
 def initial_state():
     """
@@ -130,6 +185,11 @@ def minimax(board):
     if terminal(board):
         return None
 
+    # Solved positions need no search
+    move = book_move(board)
+    if move is not None:
+        return move
+
     moves = []
     if player(board) == O:
         for action in actions(board):
@@ -146,23 +206,223 @@ def max_value(board):
     """
     Returns the greatest score out of all possible moves
     """
+    search_stats["nodes"] += 1
+    key = canonical_index(board)[0]
+    if key in transpositions:
+        cache_stats["hits"] += 1
+        return transpositions[key]
+    cache_stats["misses"] += 1
+
     if terminal(board):
-        return utility(board)
-    
-    v = -math.inf
-    for action in actions(board):
-        v = max(v, min_value(result(board, action)))
+        v = utility(board)
+    else:
+        v = -math.inf
+        for action in actions(board):
+            v = max(v, min_value(result(board, action)))
+    transpositions[key] = v
     return v
 
 
 def min_value(board):
     """
     Returns the lowest score out of all possible moves value
-    """ 
+    """
+    search_stats["nodes"] += 1
+    key = canonical_index(board)[0]
+    if key in transpositions:
+        cache_stats["hits"] += 1
+        return transpositions[key]
+    cache_stats["misses"] += 1
+
+    if terminal(board):
+        v = utility(board)
+    else:
+        v = math.inf
+        for action in actions(board):
+            v = min(v, max_value(result(board, action)))
+    transpositions[key] = v
+    return v
+
+
+def alphabeta(board):
+    """
+    Returns an optimal action for the current player on the board,
+    like minimax, but searching with alpha-beta pruning. Winning moves
+    are tried first, then blocks, then centre, corners and edges, and a
+    forced win (+1 for X, -1 for O) stops the search at once.
+    """
+    if terminal(board):
+        return None
+
+    best_action = None
+    if player(board) == X:
+        best = -math.inf
+        for action in ordered_actions(board):
+            v = alphabeta_min(result(board, action), best, math.inf)
+            if v > best:
+                best, best_action = v, action
+            if best == 1:
+                break
+    else:
+        best = math.inf
+        for action in ordered_actions(board):
+            v = alphabeta_max(result(board, action), -math.inf, best)
+            if v < best:
+                best, best_action = v, action
+            if best == -1:
+                break
+    return best_action
+
+
+def alphabeta_max(board, alpha, beta):
+    """
+    Returns X's best score, cutting off once it reaches beta
+    (O will avoid this line) or a win.
+    """
+    search_stats["nodes"] += 1
+    if terminal(board):
+        return utility(board)
+
+    v = -math.inf
+    for action in ordered_actions(board):
+        v = max(v, alphabeta_min(result(board, action), alpha, beta))
+        if v >= beta or v == 1:
+            return v
+        alpha = max(alpha, v)
+    return v
+
+
+def alphabeta_min(board, alpha, beta):
+    """
+    Returns O's best score, cutting off once it reaches alpha
+    (X will avoid this line) or a win.
+    """
+    search_stats["nodes"] += 1
     if terminal(board):
         return utility(board)
 
     v = math.inf
-    for action in actions(board):
-        v = min(v, max_value(result(board, action)))
-    return v
\ No newline at end of file
+    for action in ordered_actions(board):
+        v = min(v, alphabeta_max(result(board, action), alpha, beta))
+        if v <= alpha or v == -1:
+            return v
+        beta = min(beta, v)
+    return v
+
+
+def ordered_actions(board):
+    """
+    Returns the actions on the board in search order: moves that win
+    for the current player, then moves that block the opponent's win,
+    then the rest by PREFERENCE.
+    """
+    me = player(board)
+    opponent = O if me == X else X
+
+    def rank(action):
+        if completes_line(board, action, me):
+            return 0
+        if completes_line(board, action, opponent):
+            return 1
+        return 2 + PREFERENCE[action[0]][action[1]]
+
+    return sorted(actions(board), key=lambda action: (rank(action), action))
+
+
+def completes_line(board, action, mark):
+    """
+    Returns True if placing mark at action gives mark three in a row.
+    """
+    trial = [row[:] for row in board]
+    trial[action[0]][action[1]] = mark
+    return winner(trial) == mark
+
+
+def load_book(path=BOOK_PATH):
+    """
+    Loads the opening book from path, if there is a valid one.
+    Returns True if a book is now loaded.
+    """
+    global book, book_loaded
+    book_loaded = True
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        book = None
+        return False
+    records = data[len(BOOK_MAGIC):]
+    if data[:len(BOOK_MAGIC)] != BOOK_MAGIC or len(records) % 3:
+        book = None
+        return False
+    book = {
+        records[i] | records[i + 1] << 8: records[i + 2]
+        for i in range(0, len(records), 3)
+    }
+    return True
+
+
+def book_index(board):
+    """
+    Returns the board's cells read row by row as a base-3 number,
+    with EMPTY as 0, X as 1 and O as 2.
+    """
+    index = 0
+    for row in reversed(board):
+        for cell in reversed(row):
+            index = index * 3 + (0 if cell == EMPTY else 1 if cell == X else 2)
+    return index
+
+
+def canonical_index(board):
+    """
+    Returns (index, permutation) for the symmetric image of the board
+    with the smallest book_index: index is that book_index, and
+    permutation is the entry of SYMMETRIES that produces it. Boards
+    that are rotations or reflections of each other share an index.
+    """
+    codes = [0 if cell == EMPTY else 1 if cell == X else 2
+             for row in board for cell in row]
+    best = None
+    for permutation in SYMMETRIES:
+        index = 0
+        for k in range(8, -1, -1):
+            index = index * 3 + codes[permutation[k]]
+        if best is None or index < best[0]:
+            best = (index, permutation)
+    return best
+
+
+def book_move(board):
+    """
+    Returns the opening book's move for the board, or None if there
+    is no book or the board is not in it. Loads the book on first use.
+    """
+    if not book_loaded:
+        load_book()
+    if book is None:
+        return None
+    index, permutation = canonical_index(board)
+    entry = book.get(index)
+    if entry is None or entry & 0x0F == BOOK_NO_MOVE:
+        return None
+
+    # The stored move is on the canonical board; map it back
+    return divmod(permutation[entry & 0x0F], 3)
+
+
+def board_key(board):
+    """
+    Returns an immutable encoding of the board, usable as a dict key.
+    The player to move follows from the board, so it is left out.
+    """
+    return tuple(cell for row in board for cell in row)
+
+
+def clear_transpositions():
+    """
+    Empties the transposition table and resets its statistics.
+    """
+    transpositions.clear()
+    cache_stats["hits"] = 0
+    cache_stats["misses"] = 0
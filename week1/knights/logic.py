@@ -1,12 +1,32 @@
 import itertools
+import weakref
+
+# Models evaluated together by the "bits" method, as a power of two
+BLOCK_BITS = 16
 
 
 class Sentence():
 
+    # Each sentence caches its hash and the frozenset of its symbol names
+    __slots__ = ("_hash", "_symbols", "__weakref__")
+
+    # Sentences in use, keyed by class and parts (or name, for a Symbol),
+    # so that structurally equal sentences are built as one object
+    interned = weakref.WeakValueDictionary()
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def evaluate_bits(self, columns, full):
+        """
+        Evaluates the logical sentence in many models at once: columns
+        maps each symbol to an int holding its value in model i at bit i,
+        full has a bit set for every model, and the result holds the
+        sentence's value in each model the same way.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
@@ -15,11 +35,67 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def symbol_set(self):
+        """Returns the frozenset of symbols, computed once per sentence."""
+        if self._symbols is None:
+            self._symbols = frozenset().union(
+                *[part.symbol_set() for part in self.parts()]
+            )
+        return self._symbols
+
+    def parts(self):
+        """Returns the sentences this sentence is made of."""
+        return []
+
+    def compile(self, names=None):
+        """
+        Returns a function evaluating the logical sentence on a sequence
+        of booleans, the i-th being the value of the i-th of names
+        (all symbols of the sentence in sorted order by default).
+        """
+        if names is None:
+            names = sorted(self.symbols())
+        return Compiler(names).compile(self)
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
             raise TypeError("must be a logical sentence")
 
+    @classmethod
+    def intern(cls, sentence):
+        """
+        Returns the shared sentence structurally equal to sentence, for use
+        as part of another sentence. Only an And can be unshared, as it
+        may still be added to; once shared it no longer can be.
+        """
+        if not isinstance(sentence, And):
+            Sentence.validate(sentence)
+        elif not sentence.shared:
+            key = (type(sentence), *sentence.conjuncts)
+            shared = Sentence.interned.get(key)
+            if shared is not None:
+                return shared
+            sentence.shared = True
+            Sentence.interned[key] = sentence
+        return sentence
+
+    @classmethod
+    def build(cls, kind, parts):
+        """
+        Returns the interned sentence of class kind made of parts (already
+        interned), and whether it is new and still needs its fields set.
+        """
+        key = (kind, *parts)
+        sentence = Sentence.interned.get(key)
+        if sentence is not None:
+            return sentence, False
+        sentence = object.__new__(kind)
+        sentence._hash = None
+        sentence._symbols = None
+        Sentence.interned[key] = sentence
+        return sentence, True
+
     @classmethod
     def parenthesize(cls, s):
         """Parenthesizes an expression if not already parenthesized."""
@@ -44,14 +120,31 @@ class Sentence():
 
 class Symbol(Sentence):
 
-    def __init__(self, name):
-        self.name = name
+    __slots__ = ("name",)
+
+    def __new__(cls, name):
+        key = (cls, name)
+        symbol = Sentence.interned.get(key)
+        if symbol is None:
+            symbol = object.__new__(cls)
+            symbol.name = name
+            symbol._hash = hash(("symbol", name))
+            symbol._symbols = frozenset([name])
+            Sentence.interned[key] = symbol
+        return symbol
+
+    # Copies and unpickled sentences go through the constructor, so they
+    # are interned too and hash with this process's string hashes
+    def __reduce__(self):
+        return (type(self), (self.name,))
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name
+        )
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        return self._hash
 
     def __repr__(self):
         return self.name
@@ -62,50 +155,88 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def evaluate_bits(self, columns, full):
+        try:
+            return columns[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
     def formula(self):
         return self.name
 
     def symbols(self):
-        return {self.name}
+        return set(self.symbol_set())
 
 
 class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
+    __slots__ = ("operand",)
+
+    def __new__(cls, operand):
+        operand = Sentence.intern(operand)
+        sentence, new = Sentence.build(cls, [operand])
+        if new:
+            sentence.operand = operand
+        return sentence
+
+    def __reduce__(self):
+        return (type(self), (self.operand,))
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and hash(self) == hash(other)
+            and self.operand == other.operand
+        )
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        if self._hash is None:
+            self._hash = hash(("not", hash(self.operand)))
+        return self._hash
 
     def __repr__(self):
         return f"Not({self.operand})"
 
+    def parts(self):
+        return [self.operand]
+
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def evaluate_bits(self, columns, full):
+        return full ^ self.operand.evaluate_bits(columns, full)
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
     def symbols(self):
-        return self.operand.symbols()
+        return set(self.symbol_set())
 
 
 class And(Sentence):
+    # A new And is its creator's own until it becomes part of another
+    # sentence and is shared, since until then it may be added to
+    __slots__ = ("conjuncts", "shared")
+
     def __init__(self, *conjuncts):
-        for conjunct in conjuncts:
-            Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        self.conjuncts = [Sentence.intern(conjunct) for conjunct in conjuncts]
+        self.shared = False
+        self._hash = None
+        self._symbols = None
+
+    def __reduce__(self):
+        return (type(self), tuple(self.conjuncts))
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And) and hash(self) == hash(other)
+            and self.conjuncts == other.conjuncts
+        )
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        if self._hash is None:
+            self._hash = hash(
+                ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+            )
+        return self._hash
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -113,13 +244,29 @@ class And(Sentence):
         )
         return f"And({conjunctions})"
 
+    def parts(self):
+        return self.conjuncts
+
     def add(self, conjunct):
-        Sentence.validate(conjunct)
+        if self.shared:
+            raise ValueError("cannot add to a sentence that is part of "
+                             "another sentence")
+        conjunct = Sentence.intern(conjunct)
         self.conjuncts.append(conjunct)
+        self._hash = None
+        self._symbols = None
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def evaluate_bits(self, columns, full):
+        result = full
+        for conjunct in self.conjuncts:
+            result &= conjunct.evaluate_bits(columns, full)
+            if not result:
+                break
+        return result
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
@@ -127,30 +274,53 @@ class And(Sentence):
                            for conjunct in self.conjuncts])
 
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        return set(self.symbol_set())
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
-        for disjunct in disjuncts:
-            Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+    __slots__ = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
+        disjuncts = [Sentence.intern(disjunct) for disjunct in disjuncts]
+        sentence, new = Sentence.build(cls, disjuncts)
+        if new:
+            sentence.disjuncts = disjuncts
+        return sentence
+
+    def __reduce__(self):
+        return (type(self), tuple(self.disjuncts))
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (
+            isinstance(other, Or) and hash(self) == hash(other)
+            and self.disjuncts == other.disjuncts
+        )
 
     def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        if self._hash is None:
+            self._hash = hash(
+                ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+            )
+        return self._hash
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
 
+    def parts(self):
+        return self.disjuncts
+
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def evaluate_bits(self, columns, full):
+        result = 0
+        for disjunct in self.disjuncts:
+            result |= disjunct.evaluate_bits(columns, full)
+            if result == full:
+                break
+        return result
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
@@ -158,75 +328,126 @@ class Or(Sentence):
                             for disjunct in self.disjuncts])
 
     def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+        return set(self.symbol_set())
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
-        Sentence.validate(antecedent)
-        Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
+        antecedent = Sentence.intern(antecedent)
+        consequent = Sentence.intern(consequent)
+        sentence, new = Sentence.build(cls, [antecedent, consequent])
+        if new:
+            sentence.antecedent = antecedent
+            sentence.consequent = consequent
+        return sentence
+
+    def __reduce__(self):
+        return (type(self), (self.antecedent, self.consequent))
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication) and hash(self) == hash(other)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent
+        )
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        if self._hash is None:
+            self._hash = hash(("implies", hash(self.antecedent),
+                               hash(self.consequent)))
+        return self._hash
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
 
+    def parts(self):
+        return [self.antecedent, self.consequent]
+
     def evaluate(self, model):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def evaluate_bits(self, columns, full):
+        return ((full ^ self.antecedent.evaluate_bits(columns, full))
+                | self.consequent.evaluate_bits(columns, full))
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
     def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+        return set(self.symbol_set())
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
-        Sentence.validate(left)
-        Sentence.validate(right)
-        self.left = left
-        self.right = right
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
+        left = Sentence.intern(left)
+        right = Sentence.intern(right)
+        sentence, new = Sentence.build(cls, [left, right])
+        if new:
+            sentence.left = left
+            sentence.right = right
+        return sentence
+
+    def __reduce__(self):
+        return (type(self), (self.left, self.right))
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional) and hash(self) == hash(other)
+            and self.left == other.left
+            and self.right == other.right
+        )
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        if self._hash is None:
+            self._hash = hash(("biconditional", hash(self.left),
+                               hash(self.right)))
+        return self._hash
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
+    def parts(self):
+        return [self.left, self.right]
+
     def evaluate(self, model):
         return ((self.left.evaluate(model)
                  and self.right.evaluate(model))
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
+    def evaluate_bits(self, columns, full):
+        return full ^ (self.left.evaluate_bits(columns, full)
+                       ^ self.right.evaluate_bits(columns, full))
+
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
     def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+        return set(self.symbol_set())
+
+
+def model_check(knowledge, query, method="enumerate"):
+    """
+    Checks if knowledge base entails query. method is "enumerate" to try
+    every model, "compiled" to try them with compiled sentences, "bits"
+    to try them a block at a time, or "sat" to search for a model of
+    knowledge and not query.
+    """
+    if method == "sat":
+        return sat_check(knowledge, query)
+    elif method in ["bits", "compiled"]:
+        return model_check_all(knowledge, [query], method)[0]
+    elif method != "enumerate":
+        raise ValueError(f"unknown model checking method: {method}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -261,3 +482,504 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def model_check_all(knowledge, queries, method="enumerate"):
+    """
+    Checks which queries knowledge base entails, enumerating (or solving
+    for) its models once for all of them. Returns a list of booleans in
+    the order of queries.
+    """
+    queries = list(queries)
+    if method == "sat":
+        return sat_check_all(knowledge, queries)
+    elif method == "bits":
+        return bits_check_all(knowledge, queries)
+    elif method == "compiled":
+        return compiled_check_all(knowledge, queries)
+    elif method != "enumerate":
+        raise ValueError(f"unknown model checking method: {method}")
+
+    symbols = set.union(knowledge.symbols(),
+                        *[query.symbols() for query in queries])
+    entailed = [True] * len(queries)
+    pending = list(range(len(queries)))
+    for model in models(symbols):
+        if not knowledge.evaluate(model):
+            continue
+
+        # A model of the knowledge base where a query is false refutes it
+        for i in pending:
+            if not queries[i].evaluate(model):
+                entailed[i] = False
+        pending = [i for i in pending if entailed[i]]
+        if not pending:
+            break
+    return entailed
+
+
+def models(symbols):
+    """Yields every assignment of truth values to symbols, as a dict."""
+    names = sorted(symbols)
+    for values in itertools.product([True, False], repeat=len(names)):
+        yield dict(zip(names, values))
+
+
+def compiled_check_all(knowledge, queries):
+    """
+    Checks which queries knowledge base entails, trying every model as
+    a tuple of values with compiled sentences.
+    """
+    names = sorted(set.union(knowledge.symbols(),
+                             *[query.symbols() for query in queries]))
+    holds = knowledge.compile(names)
+    checks = [query.compile(names) for query in queries]
+
+    entailed = [True] * len(queries)
+    pending = list(range(len(queries)))
+    for values in itertools.product([True, False], repeat=len(names)):
+        if not holds(values):
+            continue
+        for i in pending:
+            if not checks[i](values):
+                entailed[i] = False
+        pending = [i for i in pending if entailed[i]]
+        if not pending:
+            break
+    return entailed
+
+
+class Compiler():
+    """
+    Lowers sentences to the source of one flat Python function: each
+    compound subsentence becomes one assignment to a local, reading
+    symbols by position from the argument, and a subsentence that
+    occurs more than once is computed once.
+    """
+
+    def __init__(self, names):
+        self.slots = {name: i for i, name in enumerate(names)}
+        self.lines = []
+        self.locals = {}
+
+    def compile(self, sentence):
+        """Returns the evaluating function for sentence."""
+        result = self.lower(sentence)
+        source = "def evaluate(values):\n"
+        for line in self.lines:
+            source += f"    {line}\n"
+        source += f"    return {result}\n"
+
+        namespace = {}
+        exec(source, namespace)
+        evaluate = namespace["evaluate"]
+        evaluate.source = source
+        return evaluate
+
+    def lower(self, sentence):
+        """
+        Returns an expression holding the value of sentence, adding the
+        lines that compute it the first time sentence is seen.
+        """
+        if isinstance(sentence, Symbol):
+            if sentence.name not in self.slots:
+                raise Exception(f"variable {sentence.name} not in model")
+            return f"values[{self.slots[sentence.name]}]"
+        if sentence in self.locals:
+            return self.locals[sentence]
+
+        if isinstance(sentence, Not):
+            expression = f"not {self.lower(sentence.operand)}"
+        elif isinstance(sentence, And):
+            parts = [self.lower(conjunct) for conjunct in sentence.conjuncts]
+            expression = " and ".join(parts) if parts else "True"
+        elif isinstance(sentence, Or):
+            parts = [self.lower(disjunct) for disjunct in sentence.disjuncts]
+            expression = " or ".join(parts) if parts else "False"
+        elif isinstance(sentence, Implication):
+            antecedent = self.lower(sentence.antecedent)
+            consequent = self.lower(sentence.consequent)
+            expression = f"not {antecedent} or {consequent}"
+        elif isinstance(sentence, Biconditional):
+            left = self.lower(sentence.left)
+            right = self.lower(sentence.right)
+            expression = f"(not {left}) == (not {right})"
+        else:
+            raise TypeError(f"cannot compile {type(sentence).__name__}")
+
+        local = f"t{len(self.locals)}"
+        self.lines.append(f"{local} = {expression}")
+        self.locals[sentence] = local
+        return local
+
+
+def bits_check_all(knowledge, queries):
+    """
+    Checks which queries knowledge base entails, evaluating every
+    sentence over a block of up to 2 ** BLOCK_BITS models per pass, so
+    memory stays bounded however many symbols there are.
+    """
+    symbols = set.union(knowledge.symbols(),
+                        *[query.symbols() for query in queries])
+    entailed = [True] * len(queries)
+    pending = list(range(len(queries)))
+    for columns, full in truth_columns(sorted(symbols)):
+        satisfied = knowledge.evaluate_bits(columns, full)
+        if not satisfied:
+            continue
+        for i in pending:
+            if satisfied & ~queries[i].evaluate_bits(columns, full):
+                entailed[i] = False
+        pending = [i for i in pending if entailed[i]]
+        if not pending:
+            break
+    return entailed
+
+
+def truth_columns(names):
+    """
+    Yields (columns, full) for each block of models over names, as taken
+    by evaluate_bits. Within a block the first BLOCK_BITS names take every
+    combination of values, and the rest are fixed by the block number.
+    """
+    inner = min(len(names), BLOCK_BITS)
+    size = 1 << inner
+    full = (1 << size) - 1
+
+    # Bit i of a column holds bit j of i, for the j-th name in the block
+    patterns = []
+    for j in range(inner):
+        run = 1 << j
+        unit = ((1 << run) - 1) << run
+        patterns.append(unit * (full // ((1 << (2 * run)) - 1)))
+    columns = dict(zip(names, patterns))
+
+    for block in range(1 << (len(names) - inner)):
+        for j, name in enumerate(names[inner:]):
+            columns[name] = full if block >> j & 1 else 0
+        yield columns, full
+
+
+class CNF():
+    """
+    Clauses in conjunctive normal form, built from sentences by the
+    Tseitin transformation: every compound subsentence gets a fresh
+    variable defined equal to it, so the clauses grow linearly with the
+    sentences instead of exponentially. Literals are nonzero ints, -v
+    for the negation of variable v, and clauses are lists of literals.
+    The clauses are satisfiable exactly when the sentences added are.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = {}
+        self.num_variables = 0
+
+        # Literal standing for each subsentence encoded so far
+        self.literals = {}
+
+    def variable(self):
+        """Returns a new variable."""
+        self.num_variables += 1
+        return self.num_variables
+
+    def add(self, sentence):
+        """Adds clauses asserting that sentence is true."""
+        Sentence.validate(sentence)
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(disjunct)
+                                 for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Returns a literal equal to sentence, adding the clauses that
+        define it the first time sentence is seen.
+        """
+        if isinstance(sentence, Symbol):
+            if sentence.name not in self.variables:
+                self.variables[sentence.name] = self.variable()
+            return self.variables[sentence.name]
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        v = self.variable()
+        if isinstance(sentence, And):
+            parts = [self.literal(conjunct) for conjunct in sentence.conjuncts]
+            for part in parts:
+                self.clauses.append([-v, part])
+            self.clauses.append([v] + [-part for part in parts])
+        elif isinstance(sentence, (Or, Implication)):
+            if isinstance(sentence, Or):
+                parts = [self.literal(disjunct)
+                         for disjunct in sentence.disjuncts]
+            else:
+                parts = [-self.literal(sentence.antecedent),
+                         self.literal(sentence.consequent)]
+            for part in parts:
+                self.clauses.append([v, -part])
+            self.clauses.append([-v] + parts)
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            self.clauses.extend([
+                [-v, -left, right], [-v, left, -right],
+                [v, left, right], [v, -left, -right]
+            ])
+        else:
+            raise TypeError(f"cannot convert {type(sentence).__name__}")
+        self.literals[sentence] = v
+        return v
+
+
+class Solver():
+    """
+    DPLL satisfiability solver with clause learning: unit propagation
+    over two watched literals per clause, and on each conflict a learned
+    clause (first unique implication point) that sends the search back
+    to the highest decision level where it is still unit.
+    """
+
+    def __init__(self, clauses, num_variables):
+        n = num_variables + 1
+        self.values = [None] * n
+        self.levels = [0] * n
+        self.reasons = [None] * n
+        self.activity = [0.0] * n
+        self.phases = [False] * n
+        self.bump = 1.0
+
+        self.clauses = []
+        self.watches = {}
+        self.trail = []
+        self.decisions = []
+        self.head = 0
+        self.conflicted = False
+
+        for clause in clauses:
+            self.add(clause)
+
+    def value(self, literal):
+        """Returns True, False or None if literal is unassigned."""
+        value = self.values[abs(literal)]
+        if value is None or literal > 0:
+            return value
+        return not value
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = literal > 0
+        self.levels[variable] = len(self.decisions)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def add(self, clause):
+        """Adds a clause before solving."""
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            return
+        if not clause:
+            self.conflicted = True
+        elif len(clause) == 1:
+            value = self.value(clause[0])
+            if value is False:
+                self.conflicted = True
+            elif value is None:
+                self.assign(clause[0], None)
+        else:
+            self.watch(clause)
+
+    def watch(self, clause):
+        """Stores clause, watching its first two literals."""
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches.setdefault(clause[0], []).append(index)
+        self.watches.setdefault(clause[1], []).append(index)
+        return index
+
+    def propagate(self):
+        """
+        Assigns every literal forced by a unit clause. Returns the index
+        of a clause with all literals false, or None.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches.get(false, [])
+            kept = []
+            conflict = None
+            for position, index in enumerate(watching):
+                clause = self.clauses[index]
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) is True:
+                    kept.append(index)
+                    continue
+
+                # Move the watch to any literal that is not false
+                for i in range(2, len(clause)):
+                    if self.value(clause[i]) is not False:
+                        clause[1], clause[i] = clause[i], clause[1]
+                        self.watches.setdefault(clause[1], []).append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) is False:
+                        conflict = index
+                        kept.extend(watching[position + 1:])
+                        break
+                    self.assign(clause[0], index)
+            self.watches[false] = kept
+            if conflict is not None:
+                return conflict
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (clause, level): the clause learned from a conflict, with
+        its literal asserted after backjumping first, and that level.
+        """
+        level = len(self.decisions)
+        learned = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        position = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for other in clause:
+                variable = abs(other)
+                if literal is not None and variable == abs(literal):
+                    continue
+                if variable not in seen and self.levels[variable] > 0:
+                    seen.add(variable)
+                    self.activity[variable] += self.bump
+                    if self.levels[variable] == level:
+                        pending += 1
+                    else:
+                        learned.append(other)
+
+            # Resolve on the latest assignment involved in the conflict
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+
+        # Watch the literal that becomes false last
+        latest = max(range(1, len(learned)),
+                     key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[latest] = learned[latest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def backtrack(self, level):
+        """Undoes every assignment above decision level."""
+        if len(self.decisions) <= level:
+            return
+        for literal in self.trail[self.decisions[level]:]:
+            variable = abs(literal)
+            self.phases[variable] = literal > 0
+            self.values[variable] = None
+            self.reasons[variable] = None
+        del self.trail[self.decisions[level]:]
+        del self.decisions[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns the unassigned variable with the most activity, or None."""
+        best = None
+        for variable in range(1, len(self.values)):
+            if self.values[variable] is None and (
+                best is None or self.activity[variable] > self.activity[best]
+            ):
+                best = variable
+        return best
+
+    def solve(self):
+        """
+        Returns a satisfying assignment as a list of values indexed by
+        variable (index 0 unused), or None if the clauses are unsatisfiable.
+        """
+        if self.conflicted:
+            return None
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.decisions:
+                    return None
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.assign(learned[0], self.watch(learned))
+
+                # Later conflicts count for more
+                self.bump *= 1.05
+                continue
+
+            variable = self.decide()
+            if variable is None:
+                return list(self.values)
+            self.decisions.append(len(self.trail))
+            literal = variable if self.phases[variable] else -variable
+            self.assign(literal, None)
+
+
+def sat_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by checking that knowledge
+    and not query together have no model.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+
+    # Assert the query's literal false, rather than building Not(query),
+    # which would share the caller's sentence and freeze it if an And
+    literal = cnf.literal(query)
+    solution = Solver(cnf.clauses + [[-literal]], cnf.num_variables).solve()
+    return solution is None
+
+
+def sat_check_all(knowledge, queries):
+    """
+    Checks which queries knowledge base entails. The knowledge base is
+    converted once, and every model found while refuting one query also
+    refutes any other query it makes false, without another solve.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+
+    # Encode every query symbol, so that each model assigns all of them
+    literals = [cnf.literal(query) for query in queries]
+
+    entailed = [None] * len(queries)
+    for i, literal in enumerate(literals):
+        if entailed[i] is not None:
+            continue
+        solution = Solver(cnf.clauses + [[-literal]], cnf.num_variables).solve()
+        if solution is None:
+            entailed[i] = True
+            continue
+        model = {name: solution[variable]
+                 for name, variable in cnf.variables.items()}
+        for j in range(i, len(queries)):
+            if entailed[j] is None and not queries[j].evaluate(model):
+                entailed[j] = False
+    return entailed